@@ -0,0 +1,6 @@
+"""
+Shared helpers for the mathviz scenes.
+
+The scenes themselves live in ``scenes/`` and are rendered with manim; this package
+holds the reusable pieces (caches, pipelines, tooling) they are built on.
+"""
@@ -0,0 +1,250 @@
+"""
+Automatic groupings between the tokens of two equation steps.
+
+animate_eq_transformation pairs the tokens of consecutive steps through color
+groupings written by hand. align_tokens() computes them instead:
+
+1. Both token lists are split the way MathTex splits them (``{{...}}`` pieces), so
+   indices match the submobjects of the compiled equations.
+2. A sequence alignment (edit distance over normalized token content, O(n·m))
+   pairs tokens that are written the same, or are equal as sympy expressions
+   (``(-4a)`` and ``-4a``), keeping the left-to-right order.
+3. Target tokens left over are explained by the sources: a copy of an equal source
+   (distribution writes a factor several times), a sum of like terms
+   (``b``, ``+6b`` -> ``7b``) or a product of the factors of one term (``3``,
+   ``4`` -> ``12``).
+   Every merge is checked for sympy equality before it is accepted.
+
+Operators and brackets (``=``, ``\\cdot``, ``(``) are never grouped, so they fade in.
+"""
+
+import re
+
+from manim import (
+    BLUE,
+    GREEN,
+    ORANGE,
+    PINK,
+    PURPLE,
+    RED,
+    TEAL,
+    WHITE,
+    YELLOW,
+    interpolate_color,
+)
+from sympy import Integer, expand, fraction
+
+from mathviz.latex_parser import parse_native
+from mathviz.terms import monomial
+
+GROUP_COLORS = [YELLOW, BLUE, PURPLE, GREEN, ORANGE, TEAL, PINK, RED]
+
+# Alignment costs: leaving a token unpaired, pairing tokens that are equal as
+# expressions but written differently. Identical tokens pair for free.
+GAP_COST = 1.0
+EQUIVALENT_COST = 0.25
+
+
+def group_color(i):
+    """A distinct color for the i-th group (lighter shades once the palette runs out)."""
+    base = GROUP_COLORS[i % len(GROUP_COLORS)]
+    rounds = i // len(GROUP_COLORS)
+    if rounds == 0:
+        return base
+    return interpolate_color(base, WHITE, 1 - 0.5**rounds)
+
+
+def groupings_for(groups):
+    """Turn (eq1_indices, eq2_indices) pairs into the color dicts of animate_eq_transformation."""
+    eq1_groupings, eq2_groupings = {}, {}
+    for i, (src_indices, tgt_indices) in enumerate(groups):
+        color = group_color(i)
+        eq1_groupings[color] = src_indices
+        eq2_groupings[color] = tgt_indices
+    return eq1_groupings, eq2_groupings
+
+
+def split_tokens(tokens):
+    """The substrings MathTex(*tokens) is made of, i.e. what len(eq) and eq[i] refer to."""
+    return [piece for t in tokens for piece in re.split("{{(.*?)}}", t) if piece]
+
+
+def normalize_token(token):
+    """Token content without spacing, \\left/\\right, a leading + or wrapping parentheses."""
+    text = re.sub(r"\s+|\\left|\\right", "", token)
+    while text.startswith("(") and text.endswith(")") and balanced(text[1:-1]):
+        text = text[1:-1]
+    return text.lstrip("+")
+
+
+def balanced(text):
+    depth = 0
+    for char in text:
+        depth += {"(": 1, ")": -1}.get(char, 0)
+        if depth < 0:
+            return False
+    return depth == 0
+
+
+def token_value(text):
+    """Expanded sympy value of a normalized token, or None for operators and brackets."""
+    if not re.search(r"[0-9A-Za-z]", text):
+        return None
+    try:
+        return expand(parse_native(text))
+    except ValueError:
+        return None
+
+
+def divides(factor, value):
+    """True if value / factor is a monomial with an integer coefficient."""
+    quotient = value / factor
+    coefficient, rest = quotient.as_coeff_Mul()
+    return coefficient.is_integer and fraction(rest)[1] == 1
+
+
+def sequence_alignment(source, target):
+    """
+    Order-preserving pairs (i, j) of equal tokens with the lowest total cost.
+
+    source and target are lists of (normalized text, value). Classic edit-distance
+    dynamic programming, without substitutions.
+    """
+    n, m = len(source), len(target)
+
+    def match_cost(i, j):
+        (s_text, s_value), (t_text, t_value) = source[i], target[j]
+        if s_text and s_text == t_text:
+            return 0.0
+        if s_value is not None and s_value == t_value:
+            return EQUIVALENT_COST
+        return None
+
+    cost = [[0.0] * (m + 1) for _ in range(n + 1)]
+    for i in range(1, n + 1):
+        cost[i][0] = i * GAP_COST
+    for j in range(1, m + 1):
+        cost[0][j] = j * GAP_COST
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            best = min(cost[i - 1][j], cost[i][j - 1]) + GAP_COST
+            match = match_cost(i - 1, j - 1)
+            if match is not None:
+                best = min(best, cost[i - 1][j - 1] + match)
+            cost[i][j] = best
+
+    pairs = []
+    i, j = n, m
+    while i > 0 and j > 0:
+        match = match_cost(i - 1, j - 1)
+        if match is not None and cost[i][j] == cost[i - 1][j - 1] + match:
+            pairs.append((i - 1, j - 1))
+            i, j = i - 1, j - 1
+        elif cost[i][j] == cost[i - 1][j] + GAP_COST:
+            i -= 1
+        else:
+            j -= 1
+    return pairs[::-1]
+
+
+def term_ids(pieces):
+    """
+    Index of the additive term each token belongs to: a new term starts at a token
+    that is a lone + or - (or =), or that starts with a sign.
+    """
+    ids, current = [], 0
+    for piece in pieces:
+        text = re.sub(r"\s+|\\left|\\right", "", piece)
+        if text in ("+", "-", "=") or text[:1] in ("+", "-"):
+            current += 1
+        ids.append(current)
+    return ids
+
+
+def explain(value, source, terms, unused):
+    """
+    Source indices whose merge gives value: an equal source, factors of one term
+    multiplying to it, or like terms adding up to it. Returns None if none is found.
+    """
+    # A copy, preferably of a source that is not used yet.
+    equal = [i for i, (_, v) in enumerate(source) if v is not None and v == value]
+    if equal:
+        fresh = [i for i in equal if i in unused]
+        return [(fresh or equal)[0]]
+
+    # Factors of the same term, taken left to right while they still divide value.
+    for term in sorted({terms[i] for i in unused}):
+        product, chosen = Integer(1), []
+        for i in unused:
+            factor = source[i][1]
+            if terms[i] != term or factor == 0:
+                continue
+            if divides(product * factor, value):
+                product *= factor
+                chosen.append(i)
+        if len(chosen) > 1 and expand(product - value) == 0:
+            return chosen
+
+    # Like terms.
+    like = [i for i in unused if monomial(source[i][1]) == monomial(value)]
+    if len(like) > 1 and expand(sum(source[i][1] for i in like) - value) == 0:
+        return like
+    return None
+
+
+def align_tokens(eq1_tokens, eq2_tokens):
+    """
+    Compute the groups of tokens that turn into each other between two steps.
+
+    Returns a list of (eq1_indices, eq2_indices) pairs in order of their first eq2
+    token, with indices into the compiled equations (see split_tokens).
+    """
+    pieces = split_tokens(eq1_tokens)
+    terms = term_ids(pieces)
+    source = [(text, token_value(text)) for text in map(normalize_token, pieces)]
+    target = [
+        (text, token_value(text))
+        for text in map(normalize_token, split_tokens(eq2_tokens))
+    ]
+
+    pairs = [
+        (i, j)
+        for i, j in sequence_alignment(source, target)
+        if source[i][1] is not None
+    ]
+    matched = {j for _, j in pairs}
+    paired = {i for i, _ in pairs}
+    unused = [i for i, (_, v) in enumerate(source) if v is not None and i not in paired]
+    for j, (_, value) in enumerate(target):
+        if j in matched or value is None:
+            continue
+        merged = explain(value, source, terms, unused)
+        if merged is None:
+            continue
+        pairs.extend((i, j) for i in merged)
+        unused = [i for i in unused if i not in merged]
+
+    # Tokens connected through pairs form one group (union-find).
+    parent = {}
+
+    def find(node):
+        parent.setdefault(node, node)
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for i, j in pairs:
+        parent[find(("src", i))] = find(("tgt", j))
+
+    groups = {}
+    for side, index in list(parent):
+        src_indices, tgt_indices = groups.setdefault(find((side, index)), ([], []))
+        (src_indices if side == "src" else tgt_indices).append(index)
+    result = [(sorted(src), sorted(tgt)) for src, tgt in groups.values()]
+    return sorted(result, key=lambda group: group[1][0])
+
+
+def auto_groupings(eq1_tokens, eq2_tokens):
+    """align_tokens as the (eq1_groupings, eq2_groupings) of animate_eq_transformation."""
+    return groupings_for(align_tokens(eq1_tokens, eq2_tokens))
@@ -0,0 +1,60 @@
+"""
+On-disk caches shared by the mathviz tools.
+
+Everything lives under $MATHVIZ_CACHE_DIR, which defaults to ``.mathviz_cache`` in
+the current directory (the repository root when scenes are rendered as described
+in the README).
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+
+def cache_dir(*parts):
+    """Return the cache directory for parts, creating it if needed."""
+    root = Path(os.environ.get("MATHVIZ_CACHE_DIR", ".mathviz_cache"))
+    path = root.joinpath(*parts)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def hash_key(*parts):
+    """Stable hex digest for a key made of JSON-serializable parts."""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class JsonCache:
+    """
+    A directory of JSON files, one per key.
+
+    Writes go through a temporary file and an atomic rename, so several render
+    processes can share the same cache.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    @property
+    def directory(self):
+        return cache_dir(self.name)
+
+    def path_for(self, key):
+        return self.directory / f"{hash_key(key)}.json"
+
+    def get(self, key, default=None):
+        try:
+            with open(self.path_for(key), encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return default
+
+    def set(self, key, value):
+        path = self.path_for(key)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(value, f)
+        os.replace(tmp_path, path)
@@ -0,0 +1,206 @@
+"""
+The mathviz command. Run it from the repository root, e.g. ``poetry run mathviz list``.
+
+    mathviz list [paths...] [--json]
+
+lists the scenes under scenes/ (or the given files and directories) without
+importing manim or the scenes (see mathviz.discovery).
+
+    mathviz render [paths...] [--quality l] [--workers N] [--force]
+
+fingerprints every scene (see mathviz.project) and renders, in parallel, only the
+scenes whose fingerprint changed since the last render recorded in the manifest.
+
+    mathviz watch [paths...] [--quality l] [--workers N]
+
+re-renders the scenes affected by each saved change (see mathviz.watch).
+
+    mathviz profile module Scene [--quality l] [--output trace.json]
+
+renders one scene and writes a Chrome trace of its plays (see mathviz.profiling).
+
+    mathviz daemon [--jobs N]
+    mathviz submit module Scene [--quality l]
+
+start a render server that keeps manim imported, and send it a scene to render
+(see mathviz.daemon).
+
+Only the commands that render import manim, so that listing stays instant.
+"""
+
+import argparse
+import importlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from mathviz.discovery import SCENES_DIR, find_scenes
+
+
+def list_scenes(paths=(SCENES_DIR,), as_json=False):
+    """Print the scenes under paths, one per line (or as a JSON list)."""
+    scenes = find_scenes(paths)
+    if as_json:
+        print(json.dumps(scenes, indent=1))
+        return
+    for scene in scenes:
+        chain = " -> ".join(scene["bases"])
+        print(f"{scene['path']}:{scene['line']}  {scene['name']}  ({chain})")
+
+
+def render_one(module_name, scene_name, quality, batch_tex=None):
+    """Worker entry point: render one scene of a module and return the output path."""
+    from mathviz.render import render_scene
+
+    module = importlib.import_module(module_name)
+    return render_scene(
+        getattr(module, scene_name), quality, batch_tex, input_file=module.__file__
+    )
+
+
+def render_changed(
+    paths=(SCENES_DIR,), quality="l", workers=None, force=False, batch_tex=None
+):
+    """
+    Render the scenes under paths whose fingerprint changed, skip the others.
+
+    With batch_tex, the tex strings of every scene are compiled in one LaTeX run
+    first; by default only those of the scenes with BATCH_TEX = True are (see
+    mathviz.tex_batch).
+
+    Returns the ids ("module:Scene") of the scenes that failed.
+    """
+    from mathviz.project import Manifest, fingerprint, project_scenes
+
+    manifest = Manifest()
+    stale = {}
+    skipped = 0
+    for scene_id, scene_cls in project_scenes(paths):
+        digest = fingerprint(scene_cls, scene_id=scene_id)
+        if not force and manifest.is_fresh(scene_id, quality, digest):
+            skipped += 1
+        else:
+            stale[scene_id] = digest
+    print(f"{len(stale)} scene(s) to render, {skipped} unchanged")
+
+    failed = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(render_one, *scene_id.split(":"), quality, batch_tex): scene_id
+            for scene_id in stale
+        }
+        for future in as_completed(futures):
+            scene_id = futures[future]
+            try:
+                output = future.result()
+            except Exception as e:
+                print(f"failed: {scene_id}: {e}")
+                failed.append(scene_id)
+                continue
+            manifest.record(scene_id, quality, stale[scene_id], output)
+            # Saved after each scene, so an interrupted run keeps what it rendered.
+            manifest.save()
+            print(f"rendered: {scene_id} -> {output}")
+    return failed
+
+
+def main(argv=None):
+    # The scenes are imported as packages of the current directory.
+    sys.path.insert(0, os.getcwd())
+
+    parser = argparse.ArgumentParser(prog="mathviz")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    listing = commands.add_parser("list", help="list the scenes without importing them")
+    listing.add_argument(
+        "paths", nargs="*", default=[SCENES_DIR], help="scene files or directories"
+    )
+    listing.add_argument("--json", action="store_true", help="print JSON metadata")
+
+    render = commands.add_parser(
+        "render", help="render the scenes that changed since the last render"
+    )
+    render.add_argument(
+        "paths", nargs="*", default=[SCENES_DIR], help="scene files or directories"
+    )
+    render.add_argument("--quality", default="l", help="l, m, h, p or k (as manim -q)")
+    render.add_argument("--workers", type=int, default=os.cpu_count())
+    render.add_argument(
+        "--force", action="store_true", help="render every scene, changed or not"
+    )
+    render.add_argument(
+        "--batch-tex",
+        action="store_true",
+        default=None,
+        help="compile each scene's tex strings in one LaTeX run first",
+    )
+
+    watch = commands.add_parser(
+        "watch", help="re-render the scenes affected by each change"
+    )
+    watch.add_argument(
+        "paths", nargs="*", default=None, help="directories (default: scenes mathviz)"
+    )
+    watch.add_argument("--quality", default="l", help="l, m, h, p or k (as manim -q)")
+    watch.add_argument("--workers", type=int, default=os.cpu_count())
+
+    profile = commands.add_parser(
+        "profile", help="render one scene and write a trace of its plays"
+    )
+    profile.add_argument("module", help="e.g. scenes.calcullit.main")
+    profile.add_argument("scene", help="name of the Scene class")
+    profile.add_argument("--quality", default="l", help="l, m, h, p or k (as manim -q)")
+    profile.add_argument("--output", help="trace file (default: next to the video)")
+
+    daemon = commands.add_parser(
+        "daemon", help="serve render jobs from a process with manim imported"
+    )
+    daemon.add_argument("--socket", help="Unix socket (default: in the cache)")
+    daemon.add_argument("--jobs", type=int, default=os.cpu_count())
+
+    submit = commands.add_parser("submit", help="render a scene with the daemon")
+    submit.add_argument("module", help="e.g. scenes.calcullit.main")
+    submit.add_argument("scene", help="name of the Scene class")
+    submit.add_argument("--quality", default="l", help="l, m, h, p or k (as manim -q)")
+    submit.add_argument("--socket", help="Unix socket (default: in the cache)")
+
+    args = parser.parse_args(argv)
+    if args.command == "list":
+        list_scenes(args.paths, args.json)
+    elif args.command == "render":
+        failed = render_changed(
+            args.paths, args.quality, args.workers, args.force, args.batch_tex
+        )
+        sys.exit(1 if failed else 0)
+    elif args.command == "watch":
+        from mathviz.watch import WATCHED, watch
+
+        try:
+            watch(args.paths or WATCHED, args.quality, args.workers)
+        except KeyboardInterrupt:
+            pass
+    elif args.command == "profile":
+        from mathviz.profiling import profile_scene
+
+        module = importlib.import_module(args.module)
+        print(profile_scene(getattr(module, args.scene), args.output, args.quality))
+    elif args.command == "daemon":
+        from mathviz.daemon import serve
+
+        try:
+            serve(args.socket, args.jobs)
+        except KeyboardInterrupt:
+            pass
+    elif args.command == "submit":
+        from mathviz.daemon import submit
+
+        job = {"module": args.module, "scene": args.scene, "quality": args.quality}
+        try:
+            print(submit(job, args.socket))
+        except RuntimeError as e:
+            sys.exit(str(e))
+
+
+if __name__ == "__main__":
+    main()
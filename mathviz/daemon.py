@@ -0,0 +1,182 @@
+"""
+A render server that keeps manim imported, and its client.
+
+Every manim run starts by importing manim, numpy, sympy and the project, and by
+setting up the TeX template, before drawing anything; for short exercises that is
+most of the time. The daemon does it once:
+
+    mathviz daemon [--jobs N]
+
+then forks a child per job, which starts from the warm parent and only renders.
+Jobs are sent over a Unix socket (.mathviz_cache/render.sock by default) by
+
+    mathviz submit scenes.calcullit.main Mul1 [--quality l]
+
+or by ``python -m mathviz.exercises exercises.csv --daemon``. A job is one line of
+JSON, {"scene": ..., "module": ...} or {"exercise": expression, "name": ...}, and
+so is the answer, {"output": path} or {"error": traceback}.
+
+The modules the daemon imported at start (manim, sympy and mathviz, which holds
+animate_eq_transformation) are the ones every job uses: restart it after editing
+them. The module of a scene job is imported again by each job.
+
+This module only imports manim in the daemon, so that the client stays light.
+"""
+
+import importlib
+import json
+import os
+import select
+import socket
+import sys
+import traceback
+
+from mathviz.cache import cache_dir
+
+# Modules imported once by the daemon, so that no job pays for them.
+WARM_MODULES = ("sympy", "manim", "mathviz.render", "mathviz.exercises")
+
+# Seconds between two checks for finished children while no job arrives.
+REAP_INTERVAL = 1.0
+
+
+def socket_path():
+    return os.environ.get("MATHVIZ_SOCKET") or str(cache_dir() / "render.sock")
+
+
+def warm_up():
+    """Import what renders need and set up the TeX template, in the daemon."""
+    for name in WARM_MODULES:
+        importlib.import_module(name)
+    from manim import MathTex, config
+
+    # The template is built on first access.
+    tex_template = config.tex_template
+    print(f"tex template: {tex_template.tex_compiler}")
+    try:
+        # A first tex string imports the SVG parsing code and fills the tex cache.
+        MathTex("x")
+    except Exception as e:
+        print(f"tex warm-up failed ({e})")
+
+
+def run_job(job):
+    """Render one job in this process and return the path of the output."""
+    quality = job.get("quality", "l")
+    options = job.get("options", {})
+    if "exercise" in job:
+        from mathviz.exercises import exercise_transitions, render_exercise
+
+        transitions = exercise_transitions(job["exercise"])
+        if not transitions:
+            raise ValueError(f"{job['exercise']!r} is already simplified")
+        return render_exercise(job.get("name", "ExerciseScene"), transitions, quality)
+
+    from mathviz.render import render_scene
+
+    # The daemon may have imported the module before it was last edited.
+    module = sys.modules.get(job["module"])
+    if module is None:
+        module = importlib.import_module(job["module"])
+    else:
+        module = importlib.reload(module)
+    return render_scene(
+        getattr(module, job["scene"]), quality, input_file=module.__file__, **options
+    )
+
+
+def reply(connection, answer):
+    connection.sendall(json.dumps(answer).encode("utf-8") + b"\n")
+
+
+def serve_job(connection):
+    """In the forked child: read the job, render it, answer."""
+    try:
+        job = json.loads(connection.makefile("rb").readline())
+        answer = {"output": str(run_job(job))}
+    except Exception:
+        answer = {"error": traceback.format_exc()}
+    try:
+        reply(connection, answer)
+    except OSError:
+        pass
+
+
+def reap(children, block=False):
+    """Forget the children that have exited; with block, wait for one first."""
+    if block and children:
+        children.discard(os.wait()[0])
+    for child in list(children):
+        if os.waitpid(child, os.WNOHANG)[0]:
+            children.discard(child)
+
+
+def serve(path=None, jobs=None):
+    """
+    Accept jobs on the Unix socket at path until interrupted.
+
+    Parameters:
+      path: the socket (default: socket_path()).
+      jobs: how many jobs are rendered at the same time (default: the CPU count).
+    """
+    path = path or socket_path()
+    jobs = jobs or os.cpu_count()
+    warm_up()
+
+    # 1. Take over the socket, unless another daemon is answering on it.
+    if os.path.exists(path):
+        try:
+            socket.socket(socket.AF_UNIX).connect(path)
+        except OSError:
+            os.unlink(path)
+        else:
+            raise RuntimeError(f"a daemon is already listening on {path}")
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen()
+    print(f"listening on {path}, {jobs} job(s) at a time")
+
+    # 2. Fork a child per job, waiting for one to finish when all slots are busy.
+    # Finished children are reaped while waiting for jobs, so none is left a
+    # zombie while the daemon is idle.
+    children = set()
+    try:
+        while True:
+            if not select.select([server], [], [], REAP_INTERVAL)[0]:
+                reap(children)
+                continue
+            connection, _ = server.accept()
+            while len(children) >= jobs:
+                reap(children, block=True)
+            pid = os.fork()
+            if pid == 0:
+                server.close()
+                try:
+                    serve_job(connection)
+                finally:
+                    sys.stdout.flush()
+                    sys.stderr.flush()
+                    os._exit(0)
+            connection.close()
+            children.add(pid)
+            reap(children)
+    finally:
+        server.close()
+        os.unlink(path)
+
+
+def submit(job, path=None):
+    """Send job to the daemon and return the path of the output it rendered."""
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(path or socket_path())
+    except OSError as e:
+        raise RuntimeError(
+            f"no render daemon on {path or socket_path()} (start mathviz daemon)"
+        ) from e
+    with client:
+        client.sendall(json.dumps(job).encode("utf-8") + b"\n")
+        answer = json.loads(client.makefile("rb").readline() or b"{}")
+    if "output" not in answer:
+        raise RuntimeError(answer.get("error", "the daemon closed the connection"))
+    return answer["output"]
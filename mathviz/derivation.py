@@ -0,0 +1,199 @@
+"""
+Derivations described as data instead of hand-written construct methods.
+
+A spec is a JSON (or YAML) file:
+
+    {
+      "name": "DoubleDistrib",
+      "lag_ratio": 0.5,
+      "wait_time": 1,
+      "steps": [
+        {"tokens": ["(", "2", "-a", ")\\\\cdot(", "3b", "+5", ")"]},
+        {"tokens": ["=", "2", "\\\\cdot", "3b", "+", ...],
+         "groups": [[[1], [1, 5]], [[2], [9, 13]], ...]},
+        ...
+      ]
+    }
+
+Each step after the first lists its tokens and, optionally, its groups: pairs of
+(indices in the previous step, indices in this step) that turn into each other.
+Without groups they are computed by mathviz.align.
+
+Every transition is a self-contained segment: it starts with the previous step
+alone at the top and ends with this step in its place, uncolored. A segment
+therefore only depends on its (from, to, groups) triple, which is what its cache
+key is made of: editing step 5 of a 6-step derivation re-renders the segments
+into steps 5 and 6 only, and the segments are joined without re-encoding.
+
+Usage, from the repository root:
+
+    python -m mathviz.derivation scenes/calcullit/double_distrib.json --quality l
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from manim import UP, WHITE, FadeOut, Scene
+
+from mathviz.align import align_tokens, groupings_for
+from mathviz.cache import JsonCache, hash_key
+from mathviz.render import concat_videos, render_scene
+from mathviz.tex_cache import cached_math_tex
+from mathviz.transform import animate_eq_transformation
+
+# Where the current step sits while the next one is derived below it.
+ANCHOR = 1.5 * UP
+
+# Bump when play_step changes so that stale segments are re-rendered.
+SEGMENT_VERSION = 1
+
+_segments_cache = JsonCache("derivation_segments")
+
+
+def load_spec(path):
+    """Read a derivation spec from a .json, .yaml or .yml file."""
+    path = Path(path)
+    text = path.read_text(encoding="utf-8")
+    if path.suffix in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError as e:
+            raise ImportError("YAML specs need PyYAML (pip install pyyaml)") from e
+        spec = yaml.safe_load(text)
+    else:
+        spec = json.loads(text)
+    spec.setdefault("name", path.stem)
+    return spec
+
+
+def compile_steps(spec):
+    """
+    Turn a spec into its list of transitions, one dict per segment with keys
+    from, to, groups, first (the segment that opens the derivation) and key.
+    """
+    lag_ratio = spec.get("lag_ratio", 0.5)
+    wait_time = spec.get("wait_time", 1)
+    steps = spec["steps"]
+    if len(steps) < 2:
+        raise ValueError(f"{spec['name']}: a derivation needs at least two steps")
+
+    transitions = []
+    for k in range(1, len(steps)):
+        source, target = steps[k - 1]["tokens"], steps[k]["tokens"]
+        groups = steps[k].get("groups")
+        if groups is None:
+            groups = align_tokens(source, target)
+        transition = {
+            "from": source,
+            "to": target,
+            "groups": [[list(src), list(tgt)] for src, tgt in groups],
+            "first": k == 1,
+            "lag_ratio": lag_ratio,
+            "wait_time": wait_time,
+        }
+        transition["key"] = hash_key(SEGMENT_VERSION, transition)
+        transitions.append(transition)
+    return transitions
+
+
+def play_step(scene, transition):
+    """Animate one transition: the previous step at ANCHOR turns into the next one."""
+    wait_time = transition["wait_time"]
+    eq1 = cached_math_tex(*transition["from"]).move_to(ANCHOR)
+    scene.add(eq1)
+    if transition["first"]:
+        scene.wait(wait_time)
+
+    eq1_groupings, eq2_groupings = groupings_for(transition["groups"])
+    _, eq2 = animate_eq_transformation(
+        scene,
+        transition["from"],
+        eq1_groupings,
+        transition["to"],
+        eq2_groupings,
+        wait_time=wait_time,
+        starting_eq=eq1,
+        lag_ratio=transition["lag_ratio"],
+    )
+    # Hand over to the next segment, which starts from eq2 alone and uncolored.
+    scene.play(FadeOut(eq1), eq2.animate.set_color(WHITE).move_to(ANCHOR))
+
+
+def derivation_scene(spec):
+    """Return a Scene class playing the whole derivation in one construct."""
+    transitions = compile_steps(spec)
+
+    class DerivationScene(Scene):
+        def construct(self):
+            for transition in transitions:
+                play_step(self, transition)
+
+    DerivationScene.__name__ = DerivationScene.__qualname__ = spec["name"]
+    return DerivationScene
+
+
+def step_scene(transition, name="DerivationStep"):
+    """Return a Scene class playing a single transition."""
+
+    class DerivationStep(Scene):
+        def construct(self):
+            play_step(self, transition)
+
+    DerivationStep.__name__ = DerivationStep.__qualname__ = name
+    return DerivationStep
+
+
+def render_step(transition, name, quality="l"):
+    """Worker entry point: render one segment and return the video path."""
+    output = f"{name}_{transition['key'][:12]}"
+    return render_scene(step_scene(transition, name), quality, output_file=output)
+
+
+def render_derivation(spec, quality="l", workers=None):
+    """
+    Render a derivation segment by segment, reusing cached segments, and join them.
+
+    Returns the path of the joined video.
+    """
+    name = spec["name"]
+    transitions = compile_steps(spec)
+
+    paths = []
+    stale = []
+    for k, transition in enumerate(transitions):
+        cached = _segments_cache.get([transition["key"], quality])
+        if cached is not None and Path(cached).exists():
+            paths.append(cached)
+        else:
+            paths.append(None)
+            stale.append(k)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            k: pool.submit(
+                render_step, transitions[k], f"{name}Segment{k + 1}", quality
+            )
+            for k in stale
+        }
+        for k, future in futures.items():
+            paths[k] = future.result()
+            _segments_cache.set([transitions[k]["key"], quality], paths[k])
+
+    print(f"{name}: rendered {len(stale)} of {len(transitions)} segments")
+    return concat_videos(paths, Path(paths[-1]).with_name(f"{name}.mp4"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("spec", help="JSON or YAML derivation spec")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--quality", default="l", help="l, m, h, p or k (as manim -q)")
+    args = parser.parse_args()
+    print(render_derivation(load_spec(args.spec), args.quality, args.workers))
+
+
+if __name__ == "__main__":
+    main()
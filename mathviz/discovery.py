@@ -0,0 +1,208 @@
+"""
+Finding the scenes of the project without importing them.
+
+Importing a scene module runs ``from manim import *`` (up to a few seconds) and any
+module-level code it has. find_scenes() parses the files with ast instead, and
+follows base classes across files (``from x import Name`` and star imports) until
+it reaches one of manim's scene classes: Rop -> RoScene -> BaseTransformationScene
+-> Scene. Neither manim nor the scene modules are imported.
+
+Classes created at run time (``CustomScene = generate_steps_scene(...)``) are not
+class statements, so they are not found. Base classes marked ``ABSTRACT = True``
+(StepByStepScene, BaseTransformationScene) are not listed, as they are not meant
+to be rendered; see mathviz.render.is_renderable.
+"""
+
+import ast
+from pathlib import Path
+
+# manim's own scene classes, as they can be imported from manim.
+MANIM_SCENES = {
+    "Scene",
+    "MovingCameraScene",
+    "ThreeDScene",
+    "SpecialThreeDScene",
+    "ZoomedScene",
+    "VectorScene",
+    "LinearTransformationScene",
+}
+
+SCENES_DIR = "scenes"
+
+
+def scene_files(paths=(SCENES_DIR,)):
+    """The .py files under paths (files or directories), sorted."""
+    files = set()
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.update(p for p in path.rglob("*.py") if p.name != "__init__.py")
+        elif path.suffix == ".py":
+            files.add(path)
+    return sorted(files)
+
+
+def module_name(path):
+    """Dotted module name of a file relative to the current directory."""
+    return ".".join(Path(path).with_suffix("").parts)
+
+
+def is_abstract(node):
+    """True if a class statement sets ABSTRACT = True in its body."""
+    for item in node.body:
+        if (
+            isinstance(item, ast.Assign)
+            and any(
+                isinstance(t, ast.Name) and t.id == "ABSTRACT" for t in item.targets
+            )
+            and isinstance(item.value, ast.Constant)
+            and item.value.value is True
+        ):
+            return True
+    return False
+
+
+def dotted_name(node):
+    """The dotted name of an expression like a.b.C, None for anything else."""
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        prefix = dotted_name(node.value)
+        return prefix and f"{prefix}.{node.attr}"
+    return None
+
+
+class ModuleInfo:
+    """The top-level classes and imports of one source file."""
+
+    def __init__(self, name, path):
+        tree = ast.parse(Path(path).read_bytes(), filename=str(path))
+        self.name = name
+        self.path = Path(path)
+        # Class name -> ast.ClassDef.
+        self.classes = {}
+        # Local name -> (module, name) for "from module import name [as local]",
+        # (module, None) for "import module [as local]".
+        self.imports = {}
+        # Modules imported with "from module import *", in order.
+        self.star_imports = []
+        for node in tree.body:
+            if isinstance(node, ast.ClassDef):
+                self.classes[node.name] = node
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                for alias in node.names:
+                    if alias.name == "*":
+                        self.star_imports.append(node.module)
+                    else:
+                        local = alias.asname or alias.name
+                        self.imports[local] = (node.module, alias.name)
+            elif isinstance(node, ast.Import):
+                for alias in node.names:
+                    if alias.asname:
+                        self.imports[alias.asname] = (alias.name, None)
+                    else:
+                        top = alias.name.split(".")[0]
+                        self.imports[top] = (top, None)
+
+
+class SceneIndex:
+    """
+    Parsed modules of the project, loaded on demand, and the base class chains of
+    their classes.
+    """
+
+    def __init__(self, root="."):
+        self.root = Path(root)
+        # Module name -> ModuleInfo, or None when it is not a project file.
+        self.modules = {}
+
+    def module(self, name):
+        if name not in self.modules:
+            base = self.root.joinpath(*name.split("."))
+            for path in (base.with_suffix(".py"), base / "__init__.py"):
+                if path.is_file():
+                    self.modules[name] = ModuleInfo(name, path)
+                    break
+            else:
+                self.modules[name] = None
+        return self.modules[name]
+
+    def resolve(self, module, name):
+        """
+        Where the class called name in module comes from: ("manim", name) for a
+        manim scene class, (module name, class name) for a project class, or None.
+        """
+        if name in module.classes:
+            return (module.name, name)
+        if "." in name:
+            head, *middle, last = name.split(".")
+            imported = module.imports.get(head)
+            if imported is None or imported[1] is not None:
+                return None
+            return self.resolve_in(".".join([imported[0], *middle]), last)
+        if name in module.imports:
+            source, original = module.imports[name]
+            return self.resolve_in(source, original) if original else None
+        for source in module.star_imports:
+            found = self.resolve_in(source, name)
+            if found:
+                return found
+        return None
+
+    def resolve_in(self, module_name, name):
+        if module_name.split(".")[0] == "manim":
+            return ("manim", name) if name in MANIM_SCENES else None
+        module = self.module(module_name)
+        return self.resolve(module, name) if module else None
+
+    def scene_chain(self, module, class_name, seen=()):
+        """
+        Names of the classes from class_name up to a manim scene class, following
+        the first base that leads to one, or None if it is not a scene.
+        """
+        node = module.classes[class_name]
+        for base in map(dotted_name, node.bases):
+            found = base and self.resolve(module, base)
+            if not found or found in seen:
+                continue
+            if found[0] == "manim":
+                return [class_name, found[1]]
+            rest = self.scene_chain(
+                self.module(found[0]), found[1], seen + ((module.name, class_name),)
+            )
+            if rest:
+                return [class_name, *rest]
+        return None
+
+    def scenes(self, path):
+        """Metadata of the scene classes defined in one file."""
+        module = self.module(module_name(path))
+        if module is None:
+            module = ModuleInfo(module_name(path), path)
+            self.modules[module.name] = module
+        found = []
+        for name, node in module.classes.items():
+            chain = self.scene_chain(module, name)
+            if chain is None or is_abstract(node):
+                continue
+            doc = ast.get_docstring(node)
+            found.append(
+                {
+                    "name": name,
+                    "module": module.name,
+                    "path": str(path),
+                    "line": node.lineno,
+                    "bases": chain[1:],
+                    "doc": doc.strip().splitlines()[0] if doc else "",
+                    "construct": any(
+                        isinstance(item, ast.FunctionDef) and item.name == "construct"
+                        for item in node.body
+                    ),
+                }
+            )
+        return found
+
+
+def find_scenes(paths=(SCENES_DIR,), root="."):
+    """Metadata of every scene class defined in the files under paths, in order."""
+    index = SceneIndex(root)
+    return [scene for path in scene_files(paths) for scene in index.scenes(path)]
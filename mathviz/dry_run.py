@@ -0,0 +1,77 @@
+"""
+Running a scene's construct without rendering any frame.
+
+Some tools only need what construct builds (the tex strings it compiles, the final
+state of the scene) and not the video. SkipRenderer skips every animation and, unlike
+manim's own skipping, also skips the rasterization of static and frozen frames.
+"""
+
+from manim import tempconfig
+from manim.renderer.cairo_renderer import CairoRenderer
+from manim.utils.exceptions import EndSceneEarlyException
+
+
+class NoSkippedFrames:
+    """
+    Renderer mixin: nothing is rasterized while animations are skipped.
+
+    manim still draws the static and frozen frames of a skipped play, and every
+    frame handed to render(), because update_frame ignores skipping by default.
+    Here frames are only captured while skipping by an explicit
+    update_frame(..., ignore_skipping=True).
+    """
+
+    def update_frame(self, scene, mobjects=None, ignore_skipping=False, **kwargs):
+        if self.skip_animations and not ignore_skipping:
+            return
+        super().update_frame(
+            scene, mobjects=mobjects, ignore_skipping=ignore_skipping, **kwargs
+        )
+
+    def save_static_frame_data(self, scene, static_mobjects):
+        if self.skip_animations:
+            self.static_image = None
+            return None
+        return super().save_static_frame_data(scene, static_mobjects)
+
+    def freeze_current_frame(self, duration):
+        if self.skip_animations:
+            return
+        super().freeze_current_frame(duration)
+
+
+class SkipRenderer(NoSkippedFrames, CairoRenderer):
+    """
+    A CairoRenderer that skips all animations and never rasterizes while skipping.
+
+    Animations are still compiled and run to their final state, so the mobjects end
+    up exactly where a full render would leave them.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("skip_animations", True)
+        super().__init__(**kwargs)
+
+    def init_scene(self, scene):
+        # The renderer is built before the scene, so it cannot know the scene's
+        # camera class (e.g. MovingCamera for a MovingCameraScene) until now.
+        if type(self.camera) is not scene.camera_class:
+            self.camera = scene.camera_class()
+        super().init_scene(scene)
+
+
+def run_dry(scene_cls):
+    """
+    Run setup and construct of scene_cls with a SkipRenderer and no output files.
+
+    Returns the scene, in the state construct left it.
+    """
+    with tempconfig({"dry_run": True}):
+        scene = scene_cls(renderer=SkipRenderer())
+        scene.setup()
+        try:
+            scene.construct()
+        except EndSceneEarlyException:
+            pass
+        scene.tear_down()
+    return scene
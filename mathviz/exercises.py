@@ -0,0 +1,188 @@
+"""
+Batch pipeline: a CSV or JSONL file of expressions in, one video per row out.
+
+Usage, from the repository root:
+
+    python -m mathviz.exercises exercises.csv --workers 4 --quality l
+
+For worksheets, ``--stills png pdf`` writes an image of the final frame of each
+exercise instead of the video (see mathviz.stills). With ``--daemon``, the videos
+are rendered by a running ``mathviz daemon`` (see mathviz.daemon), which saves
+each exercise the cost of starting manim.
+
+Each row needs an ``expression`` column/key (LaTeX) and may have a ``name`` used for
+the scene and the output file. The intermediate steps, token lists and color
+groupings are derived by mathviz.terms, so nothing is indexed by hand; the videos
+are rendered in parallel worker processes.
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from manim import Scene
+
+from mathviz.align import groupings_for
+from mathviz.latex_parser import parse_expression
+from mathviz.render import render_scene
+from mathviz.stills import FORMATS, export_stills
+from mathviz.terms import derive_transitions
+from mathviz.transform import animate_eq_transformation
+
+
+def exercise_transitions(expression):
+    """Token lists and groupings for every step of the derivation of a LaTeX expression."""
+    return derive_transitions(parse_expression(expression))
+
+
+def exercise_scene(transitions, name="ExerciseScene", lag_ratio=0.5):
+    """
+    Given the transitions returned by exercise_transitions, return a new Scene class
+    that chains them with animate_eq_transformation.
+    """
+
+    class ExerciseScene(Scene):
+        def construct(self):
+            eq = None
+            for eq1_tokens, eq2_tokens, groups in transitions:
+                eq1_groupings, eq2_groupings = groupings_for(groups)
+                _, eq = animate_eq_transformation(
+                    self,
+                    eq1_tokens,
+                    eq1_groupings,
+                    eq2_tokens,
+                    eq2_groupings,
+                    starting_eq=eq,
+                    lag_ratio=lag_ratio,
+                )
+            self.wait(3)
+
+    ExerciseScene.__name__ = ExerciseScene.__qualname__ = name
+    return ExerciseScene
+
+
+def scene_name(name):
+    """A class and file name derived from a free-form row name."""
+    name = re.sub(r"\W+", "_", name).strip("_")
+    return name if name and not name[0].isdigit() else f"Exercise_{name}"
+
+
+def read_exercises(path):
+    """Return (name, expression) pairs from a CSV file with a header or a JSONL file."""
+    path = Path(path)
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.suffix == ".jsonl":
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = list(csv.DictReader(f))
+    return [
+        (scene_name(row.get("name") or f"Exercise{i + 1:04d}"), row["expression"])
+        for i, row in enumerate(rows)
+    ]
+
+
+def render_exercise(name, transitions, quality="l", stills=None):
+    """
+    Worker entry point: render one exercise and return the video path, or the image
+    paths (joined) when stills lists image formats.
+    """
+    scene_cls = exercise_scene(transitions, name)
+    if stills:
+        paths = export_stills(scene_cls, formats=stills, quality=quality)
+        return ", ".join(str(p) for p in paths)
+    return render_scene(scene_cls, quality, output_file=name)
+
+
+def submit_exercise(name, expression, quality="l"):
+    """Have the render daemon render one exercise and return the video path."""
+    from mathviz.daemon import submit
+
+    return submit({"exercise": expression, "name": name, "quality": quality})
+
+
+def run_batch(path, workers=None, quality="l", stills=None, daemon=False):
+    """
+    Render every exercise of path in parallel and print the throughput.
+
+    Rows whose expression cannot be parsed, or that need no step at all, are
+    reported and skipped before any rendering starts. With daemon, the jobs are
+    sent to the render daemon, which renders up to its own --jobs at a time.
+    """
+    jobs = []
+    for name, expression in read_exercises(path):
+        try:
+            transitions = exercise_transitions(expression)
+        except Exception as e:
+            print(f"{name}: cannot parse {expression!r} ({e})")
+            continue
+        if not transitions:
+            print(f"{name}: {expression!r} is already simplified, skipped")
+            continue
+        jobs.append((name, expression, transitions))
+
+    start = time.perf_counter()
+    done = 0
+    if daemon:
+        # Threads only wait for the daemon's answers.
+        pool = ThreadPoolExecutor(max_workers=workers)
+        futures = {
+            pool.submit(submit_exercise, name, expression, quality): name
+            for name, expression, _ in jobs
+        }
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        futures = {
+            pool.submit(render_exercise, name, transitions, quality, stills): name
+            for name, _, transitions in jobs
+        }
+    with pool:
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                print(f"{name}: {future.result()}")
+                done += 1
+            except Exception as e:
+                print(f"{name}: render failed ({e})")
+    elapsed = time.perf_counter() - start
+
+    if done:
+        print(
+            f"Rendered {done}/{len(jobs)} exercises in {elapsed:.1f}s "
+            f"({done * 3600 / elapsed:.0f} exercises/hour)"
+        )
+    return done
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", help="CSV or JSONL file with an 'expression' column")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--quality", default="l", help="l, m, h, p or k (as manim -q)")
+    parser.add_argument(
+        "--stills",
+        nargs="+",
+        choices=FORMATS,
+        help="write final-frame images in these formats instead of videos",
+    )
+    parser.add_argument(
+        "--daemon", action="store_true", help="render with a running mathviz daemon"
+    )
+    args = parser.parse_args()
+    if args.daemon and args.stills:
+        parser.error("--stills cannot be used with --daemon")
+    run_batch(
+        args.path,
+        workers=args.workers,
+        quality=args.quality,
+        stills=args.stills,
+        daemon=args.daemon,
+    )
+
+
+if __name__ == "__main__":
+    main()
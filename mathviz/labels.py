@@ -0,0 +1,259 @@
+"""
+Placing labels next to what they name without covering anything else.
+
+Hand-written offsets (``v1.get_center() + RIGHT * 0.3``) stop working as soon as
+vectors are chained or generated. LabelPlacer keeps the bounding boxes of everything
+on screen in a grid index (boxes bucketed by the square cells they cover) and tries
+a few candidate positions per label, keeping the first one that overlaps nothing.
+Testing a candidate only looks at the boxes sharing its cells, so placing a label
+costs about the same with 5 or 500 labels on screen.
+
+Arrows and lines are indexed as a chain of small boxes along the segment rather
+than one bounding box, so a label can sit in the corner a diagonal vector leaves
+free.
+
+    placer = LabelPlacer()
+    for vector, label in zip(vectors, labels):
+        placer.place(label, vector)
+    self.play(...)  # the vectors move
+    self.play(*placer.relayout_animations())
+
+After an animation, only the labels whose anchor moved (or that a moved anchor now
+covers) are placed again.
+"""
+
+import math
+from collections import defaultdict
+
+import numpy as np
+from manim import DL, DOWN, DR, LEFT, RIGHT, UL, UP, UR, Line
+
+# Length of the pieces a segment is indexed as.
+SEGMENT_STEP = 0.2
+
+# Where a label goes along a segment, in order of preference.
+SEGMENT_POSITIONS = (0.5, 0.35, 0.65, 0.2, 0.8)
+
+# Directions tried around anything that is not a segment.
+AROUND = (UP, RIGHT, DOWN, LEFT, UR, DR, DL, UL)
+
+
+def box_of(mob):
+    """Bounding box (x0, y0, x1, y1) of a mobject."""
+    x0, y0 = mob.get_corner(DL)[:2]
+    x1, y1 = mob.get_corner(UR)[:2]
+    return (x0, y0, x1, y1)
+
+
+def box_at(center, width, height):
+    x, y = center[:2]
+    return (x - width / 2, y - height / 2, x + width / 2, y + height / 2)
+
+
+def overlap(a, b):
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def segment_boxes(start, end, thickness, step=SEGMENT_STEP):
+    """Small boxes covering the segment from start to end."""
+    pieces = max(1, math.ceil(np.linalg.norm(end[:2] - start[:2]) / step))
+    points = np.linspace(start[:2], end[:2], pieces + 1)
+    pad = thickness / 2
+    return [
+        (
+            min(p[0], q[0]) - pad,
+            min(p[1], q[1]) - pad,
+            max(p[0], q[0]) + pad,
+            max(p[1], q[1]) + pad,
+        )
+        for p, q in zip(points[:-1], points[1:])
+    ]
+
+
+def mobject_boxes(mob):
+    """The boxes a mobject occupies: pieces of a segment, its bounding box otherwise."""
+    if isinstance(mob, Line):
+        start, end = mob.get_start_and_end()
+        # Leave room for the tip of an arrow.
+        thickness = 0.25 if mob.has_tip() else 0.1
+        return segment_boxes(start, end, thickness)
+    return [box_of(mob)]
+
+
+def anchor_state(mob):
+    """What decides where the label of mob goes: its ends or its bounding box."""
+    if isinstance(mob, Line):
+        return np.concatenate(mob.get_start_and_end()).round(6).tobytes()
+    return np.array(box_of(mob)).round(6).tobytes()
+
+
+class GridIndex:
+    """
+    Boxes bucketed by the square cells they cover.
+
+    Inserting, removing and testing a box only visit the cells it covers, so the
+    cost does not depend on the number of boxes in the index.
+    """
+
+    def __init__(self, cell=0.5):
+        self.cell = cell
+        # (i, j) -> keys with a box in that cell.
+        self.cells = defaultdict(set)
+        # key -> boxes.
+        self.boxes = {}
+
+    def cells_of(self, box):
+        x0, y0, x1, y1 = box
+        for i in range(math.floor(x0 / self.cell), math.floor(x1 / self.cell) + 1):
+            for j in range(math.floor(y0 / self.cell), math.floor(y1 / self.cell) + 1):
+                yield (i, j)
+
+    def insert(self, key, boxes):
+        self.remove(key)
+        self.boxes[key] = list(boxes)
+        for box in self.boxes[key]:
+            for cell in self.cells_of(box):
+                self.cells[cell].add(key)
+
+    def remove(self, key):
+        for box in self.boxes.pop(key, ()):
+            for cell in self.cells_of(box):
+                self.cells[cell].discard(key)
+                if not self.cells[cell]:
+                    del self.cells[cell]
+
+    def hits(self, box, ignore=()):
+        """Keys with a box overlapping box, except those in ignore."""
+        keys = set()
+        for cell in self.cells_of(box):
+            keys |= self.cells.get(cell, set())
+        return {
+            key
+            for key in keys - set(ignore)
+            if any(overlap(box, other) for other in self.boxes[key])
+        }
+
+
+class LabelPlacer:
+    """
+    Places labels next to their anchors, away from each other and from obstacles.
+
+    Parameters:
+      buff: space left between a label and its anchor.
+      cell: side of the cells of the grid index, about the size of a label.
+    """
+
+    def __init__(self, buff=0.15, cell=0.5):
+        self.buff = buff
+        self.index = GridIndex(cell)
+        # id(label) -> (label, anchor, anchor_state when placed).
+        self.labels = {}
+        # id(anchor) -> anchor, for the anchors and obstacles in the index.
+        self.anchors = {}
+
+    def add_obstacle(self, *mobjects):
+        """Keep labels off these mobjects (their anchors are obstacles already)."""
+        for mob in mobjects:
+            self.anchors[id(mob)] = mob
+            self.index.insert(id(mob), mobject_boxes(mob))
+
+    def candidates(self, label, anchor):
+        """Centers to try for label, best first."""
+        width, height = label.width, label.height
+        if isinstance(anchor, Line):
+            start, end = anchor.get_start_and_end()
+            direction = end - start
+            length = np.linalg.norm(direction[:2]) or 1
+            normal = np.array([-direction[1], direction[0], 0]) / length
+            # Distance from the segment to the center of the label.
+            half = (abs(normal[0]) * width + abs(normal[1]) * height) / 2
+            for distance in (1, 2, 3):
+                for t in SEGMENT_POSITIONS:
+                    for side in (1, -1):
+                        offset = distance * (half + self.buff + 0.05)
+                        yield start + t * direction + side * offset * normal
+        else:
+            center = anchor.get_center()
+            for distance in (1, 2, 3):
+                for direction in AROUND:
+                    offset = np.array(
+                        [
+                            direction[0] * (anchor.width + width) / 2,
+                            direction[1] * (anchor.height + height) / 2,
+                            0,
+                        ]
+                    )
+                    yield center + distance * (offset + self.buff * direction)
+
+    def best_position(self, label, anchor):
+        """The first candidate overlapping nothing, else the one overlapping least."""
+        ignore = {id(label)}
+        best, best_hits = None, None
+        for center in self.candidates(label, anchor):
+            hits = len(
+                self.index.hits(box_at(center, label.width, label.height), ignore)
+            )
+            if hits == 0:
+                return center
+            if best_hits is None or hits < best_hits:
+                best, best_hits = center, hits
+        return best
+
+    def place(self, label, anchor):
+        """Move label next to anchor and remember both. Returns label."""
+        self.add_obstacle(anchor)
+        center = self.best_position(label, anchor)
+        label.move_to(center)
+        self.index.insert(id(label), [box_of(label)])
+        self.labels[id(label)] = (label, anchor, anchor_state(anchor))
+        return label
+
+    def relayout_targets(self):
+        """
+        Place again the labels whose anchor moved, and the labels a moved anchor now
+        covers. Returns {label: new center}; the labels themselves are not moved.
+        """
+        # 1. Re-index the anchors that moved.
+        moved = set()
+        for key, mob in self.anchors.items():
+            boxes = mobject_boxes(mob)
+            if boxes != self.index.boxes.get(key):
+                self.index.insert(key, boxes)
+                moved.add(key)
+
+        # 2. Labels to place again: those of moved anchors and those now covered.
+        stale = {
+            key
+            for key, (_, anchor, state) in self.labels.items()
+            if anchor_state(anchor) != state
+        }
+        label_keys = set(self.labels)
+        for key in moved:
+            for box in self.index.boxes[key]:
+                stale |= self.index.hits(box) & label_keys
+
+        # 3. Free their current spots, then place them one by one.
+        for key in stale:
+            self.index.remove(key)
+        targets = {}
+        for key in stale:
+            label, anchor, _ = self.labels[key]
+            center = self.best_position(label, anchor)
+            self.index.insert(key, [box_at(center, label.width, label.height)])
+            self.labels[key] = (label, anchor, anchor_state(anchor))
+            targets[label] = center
+        return targets
+
+    def relayout(self):
+        """relayout_targets, moving the labels right away. Returns the moved labels."""
+        targets = self.relayout_targets()
+        for label, center in targets.items():
+            label.move_to(center)
+        return list(targets)
+
+    def relayout_animations(self):
+        """relayout_targets as animations, to play after the anchors moved."""
+        return [
+            label.animate.move_to(center)
+            for label, center in self.relayout_targets().items()
+        ]
@@ -0,0 +1,168 @@
+"""
+A small LaTeX parser for the algebra used in the calcullit exercises.
+
+The inputs are monomials such as 3a or -2ab^2, products written with \\cdot (or
+\\times, or by juxtaposition), parentheses with or without \\left/\\right, sums and
+differences, and integer exponents. For that subset parse_expression builds the
+sympy expression directly, unevaluated, so that terms and factors keep the order
+they were written in. Anything else is handed to sympy's parse_latex, which needs
+the ANTLR runtime; that import only happens when the fallback is used.
+"""
+
+import re
+
+from sympy import Add, Integer, Mul, Pow, S, Symbol
+
+_TOKEN = re.compile(
+    r"\s*(\\left\(|\\right\)|\\left\[|\\right\]|\\cdot|\\times|\d+|[A-Za-z]|[-+^(){}\[\]])"
+)
+
+_OPENING = {"\\left(": "\\right)", "\\left[": "\\right]", "(": ")", "[": "]", "{": "}"}
+
+
+class UnsupportedLatex(ValueError):
+    """The input is outside the subset understood by the native parser."""
+
+
+def tokenize(latex_str):
+    tokens = []
+    pos = 0
+    latex_str = latex_str.rstrip()
+    while pos < len(latex_str):
+        match = _TOKEN.match(latex_str, pos)
+        if match is None:
+            raise UnsupportedLatex(f"unexpected input at {latex_str[pos:]!r}")
+        tokens.append(match.group(1))
+        pos = match.end()
+    return tokens
+
+
+class _Parser:
+    """
+    Recursive descent over the grammar
+
+        expr     := [sign] term (sign term)*
+        term     := power ((\\cdot | \\times)? power)*
+        power    := primary [^ exponent]
+        primary  := integer | letter | ( expr ) | \\left( expr \\right) | { expr }
+        exponent := digit | { [-] integer }
+    """
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def take(self, expected=None):
+        token = self.peek()
+        if token is None or (expected is not None and token != expected):
+            raise UnsupportedLatex(
+                f"expected {expected or 'more input'}, got {token!r}"
+            )
+        self.pos += 1
+        return token
+
+    def parse(self):
+        expr = self.expr()
+        if self.peek() is not None:
+            raise UnsupportedLatex(f"unexpected {self.peek()!r}")
+        return expr
+
+    def expr(self):
+        terms = []
+        sign = "+"
+        if self.peek() in ("+", "-"):
+            sign = self.take()
+        while True:
+            terms.append(self.signed(sign, self.term()))
+            if self.peek() not in ("+", "-"):
+                break
+            sign = self.take()
+        return terms[0] if len(terms) == 1 else Add(*terms, evaluate=False)
+
+    @staticmethod
+    def signed(sign, term):
+        if sign == "+":
+            return term
+        if isinstance(term, Integer):
+            return -term
+        if isinstance(term, Mul) and isinstance(term.args[0], Integer):
+            # -2ab: fold the sign into the leading coefficient, as parse_latex does.
+            return Mul(-term.args[0], *term.args[1:], evaluate=False)
+        return Mul(S.NegativeOne, term, evaluate=False)
+
+    def term(self):
+        factors = [self.power()]
+        while True:
+            token = self.peek()
+            if token in ("\\cdot", "\\times"):
+                self.take()
+            elif not self.starts_primary(token):
+                break
+            factors.append(self.power())
+        return factors[0] if len(factors) == 1 else Mul(*factors, evaluate=False)
+
+    @staticmethod
+    def starts_primary(token):
+        return token is not None and (token in _OPENING or token.isalnum())
+
+    def power(self):
+        base = self.primary()
+        if self.peek() != "^":
+            return base
+        self.take("^")
+        if self.peek() == "{":
+            self.take()
+            negative = self.peek() == "-"
+            if negative:
+                self.take()
+            digits = self.take()
+            self.take("}")
+        else:
+            negative = False
+            digits = self.take()
+            # ^23 means (^2)3 in LaTeX: only the first digit is the exponent.
+            if digits.isdigit() and len(digits) > 1:
+                self.tokens[self.pos - 1 : self.pos] = [digits[0], digits[1:]]
+                digits = digits[0]
+        if not digits.isdigit():
+            raise UnsupportedLatex(f"non-integer exponent {digits!r}")
+        exponent = Integer(-int(digits) if negative else int(digits))
+        return Pow(base, exponent, evaluate=False)
+
+    def primary(self):
+        token = self.take()
+        if token in _OPENING:
+            inner = self.expr()
+            self.take(_OPENING[token])
+            return inner
+        if token.isdigit():
+            return Integer(int(token))
+        if token.isalpha():
+            return Symbol(token)
+        raise UnsupportedLatex(f"unexpected {token!r}")
+
+
+def parse_native(latex_str):
+    """Parse latex_str with the native parser; raise UnsupportedLatex outside the subset."""
+    tokens = tokenize(latex_str)
+    if not tokens:
+        raise UnsupportedLatex("empty expression")
+    return _Parser(tokens).parse()
+
+
+def parse_expression(latex_str):
+    """
+    Parse a LaTeX expression into an (unevaluated) sympy expression.
+
+    Uses the native parser when the input is in the supported subset and falls back
+    to sympy's parse_latex otherwise.
+    """
+    try:
+        return parse_native(latex_str)
+    except UnsupportedLatex:
+        from sympy.parsing.latex import parse_latex
+
+        return parse_latex(latex_str)
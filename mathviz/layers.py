@@ -0,0 +1,403 @@
+"""
+Rasterizing the mobjects that do not move once, instead of on every frame.
+
+At each play, manim rasterizes the static mobjects once, but only those drawn
+before the first moving one: as soon as a mobject added earlier animates (a title
+written before the grid was added, say), the whole NumberPlane is drawn again on
+every frame. The static image is also rasterized again at every play, even when
+nothing in it changed.
+
+LayeredRenderer splits what a play draws, in drawing order, into runs of static
+and moving mobjects. Each static run is rasterized once into a pixel buffer (the
+first one opaque, the others on a transparent background) that is kept across
+plays for as long as its mobjects do not change. A frame starts from the first
+buffer, draws the moving runs and composites the other buffers in between.
+
+Usage: derive a scene from LayeredScene instead of Scene, or render it with
+mathviz.render.render_scene, which uses a LayeredRenderer.
+
+The same buffers let VariantScene write several videos from one construct (with and
+without a grid, on a dark and a light background): mobjects put in an optional
+layer are only composited into the variants that show that layer.
+"""
+
+import itertools as it
+
+import cairo
+import numpy as np
+from manim import Scene, config, tempconfig
+from manim.constants import RendererType
+from manim.renderer.cairo_renderer import CairoRenderer
+from manim.utils.color import color_to_int_rgba
+from manim.utils.family import extract_mobject_family_members
+from manim.utils.iterables import list_update
+
+# Attributes the camera reads to draw a mobject, besides its points.
+DRAWN_ATTRIBUTES = (
+    "fill_rgbas",
+    "stroke_rgbas",
+    "background_stroke_rgbas",
+    "stroke_width",
+    "background_stroke_width",
+    "sheen_factor",
+    "sheen_direction",
+    "pixel_array",
+    "z_index",
+)
+
+
+def mobject_state(mob):
+    """A hashable snapshot of what the camera draws for mob (without its submobjects)."""
+    state = [id(mob), mob.points.tobytes()]
+    for name in DRAWN_ATTRIBUTES:
+        value = getattr(mob, name, None)
+        state.append(None if value is None else np.asarray(value).tobytes())
+    return tuple(state)
+
+
+def image_surface(pixels):
+    """A cairo surface over a camera pixel array (same channel order as the camera)."""
+    height, width = pixels.shape[:2]
+    return cairo.ImageSurface.create_for_data(
+        pixels.data, cairo.FORMAT_ARGB32, width, height
+    )
+
+
+def paint(ctx, surface):
+    """Composite surface over the whole target of ctx."""
+    ctx.save()
+    ctx.identity_matrix()
+    ctx.set_source_surface(surface)
+    ctx.paint()
+    ctx.restore()
+
+
+class LayeredRenderer(CairoRenderer):
+    """
+    A CairoRenderer that draws static mobjects from cached pixel buffers.
+
+    The frames are the same as CairoRenderer's; only the work done per frame changes.
+    When the camera itself moves (a MovingCamera frame being animated), every
+    mobject is drawn on every frame, as CairoRenderer does.
+    """
+
+    # Whether the first static run is drawn on the camera background.
+    opaque_background = True
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # Runs of the current play after the opaque background, in drawing order:
+        # (True, layer, transparent surface) or (False, layer, moving mobjects).
+        self.runs = None
+        # Pixel buffers of the static runs of the last play, by content.
+        self.layer_cache = {}
+
+    def init_scene(self, scene):
+        # Same as SkipRenderer: the scene's camera class is only known now.
+        if type(self.camera) is not scene.camera_class:
+            self.camera = scene.camera_class()
+        super().init_scene(scene)
+
+    def camera_state(self):
+        camera = self.camera
+        return (
+            id(camera.background),
+            np.asarray(camera.frame_center).tobytes(),
+            camera.frame_width,
+            camera.frame_height,
+            camera.pixel_width,
+            camera.pixel_height,
+        )
+
+    def layer_map(self, scene):
+        """Optional layer of each mobject, by id; runs never mix layers."""
+        return {}
+
+    def split_runs(self, scene):
+        """
+        The mobjects the frames of this play draw, as (static, layer, mobjects)
+        runs in drawing order, or None when the camera moves.
+        """
+        sources = [animation.mobject for animation in scene.animations]
+        sources += scene.foreground_mobjects
+        sources += [m for m in scene.get_mobject_family_members() if m.get_updaters()]
+        moving = {id(m) for m in extract_mobject_family_members(sources)}
+
+        indicators = getattr(self.camera, "get_mobjects_indicating_movement", list)()
+        if any(id(m) in moving or m.get_family_updaters() for m in indicators):
+            return None
+
+        drawn = extract_mobject_family_members(
+            list_update(scene.mobjects, scene.foreground_mobjects),
+            use_z_index=self.camera.use_z_index,
+            only_those_with_points=True,
+        )
+        layers = self.layer_map(scene)
+        return [
+            (static, layer, list(mobjects))
+            for (static, layer), mobjects in it.groupby(
+                drawn, lambda m: (id(m) not in moving, layers.get(id(m)))
+            )
+        ]
+
+    def rasterize(self, mobjects, opaque):
+        """Draw mobjects alone, on the background or on transparent pixels."""
+        if opaque:
+            self.camera.reset()
+        else:
+            self.camera.set_pixel_array(np.zeros_like(self.camera.pixel_array))
+        self.camera.capture_mobjects(mobjects, include_submobjects=False)
+        return self.get_frame()
+
+    def save_static_frame_data(self, scene, static_mobjects):
+        self.runs = None
+        runs = None if self.skip_animations else self.split_runs(scene)
+        if runs is None:
+            return super().save_static_frame_data(scene, static_mobjects)
+
+        # 1. Rasterize the static runs that are not cached yet.
+        camera_state = self.camera_state()
+        layers = {}
+        self.static_image = None
+        self.runs = []
+        for k, (static, layer_name, mobjects) in enumerate(runs):
+            if not static:
+                self.runs.append((False, layer_name, mobjects))
+                continue
+            opaque = k == 0 and self.opaque_background
+            key = (opaque, camera_state, tuple(map(mobject_state, mobjects)))
+            layer = self.layer_cache.get(key)
+            if layer is None:
+                layer = self.rasterize(mobjects, opaque)
+            layers[key] = layer
+            if opaque:
+                self.static_image = layer
+            else:
+                self.runs.append((True, layer_name, image_surface(layer)))
+
+        # 2. Only keep what this play uses, so the cache follows the scene.
+        self.layer_cache = layers
+        return self.static_image
+
+    def update_frame(
+        self,
+        scene,
+        mobjects=None,
+        include_submobjects=True,
+        ignore_skipping=True,
+        **kwargs,
+    ):
+        # Frames of a play are drawn from scene.moving_mobjects; anything else (the
+        # last frame, a still) is a full redraw.
+        if self.runs is None or mobjects is not scene.moving_mobjects:
+            return super().update_frame(
+                scene, mobjects, include_submobjects, ignore_skipping, **kwargs
+            )
+        if self.skip_animations and not ignore_skipping:
+            return
+        if self.static_image is not None:
+            self.camera.set_frame_to_background(self.static_image)
+        else:
+            self.camera.reset()
+        ctx = self.camera.get_cairo_context(self.camera.pixel_array)
+        for static, _, content in self.runs:
+            if static:
+                paint(ctx, content)
+            else:
+                self.camera.capture_mobjects(
+                    content, include_submobjects=False, **kwargs
+                )
+
+
+class LayeredScene(Scene):
+    """A Scene rendered by a LayeredRenderer, unless it is given a renderer."""
+
+    renderer_class = LayeredRenderer
+
+    def __init__(self, renderer=None, **kwargs):
+        if renderer is None and config.renderer == RendererType.CAIRO:
+            renderer = self.renderer_class(
+                camera_class=kwargs.get("camera_class"),
+                skip_animations=kwargs.get("skip_animations", False),
+            )
+        super().__init__(renderer=renderer, **kwargs)
+
+
+class WriterGroup:
+    """
+    The file writers of the variants of a scene, behind the file writer interface.
+
+    Calls are forwarded to every writer, except that frames and images are taken from
+    the renderer's variant_frames rather than from the argument (the first variant).
+    """
+
+    def __init__(self, renderer, writers):
+        self.renderer = renderer
+        self.writers = writers
+
+    def __getattr__(self, name):
+        values = [getattr(writer, name) for writer in self.writers.values()]
+        if not callable(values[0]):
+            return values[0]
+
+        def forward(*args, **kwargs):
+            return [value(*args, **kwargs) for value in values][0]
+
+        return forward
+
+    def is_already_cached(self, hash_invocation):
+        return all(w.is_already_cached(hash_invocation) for w in self.writers.values())
+
+    def write_frame(self, frame, num_frames=1):
+        # The writers encode queued frames in another thread, while the variant
+        # buffers are redrawn in place for the next frame: hand them copies, as
+        # CairoRenderer.get_frame does.
+        for suffix, writer in self.writers.items():
+            writer.write_frame(
+                np.array(self.renderer.variant_frames[suffix]), num_frames
+            )
+
+    def save_image(self, image):
+        camera = self.renderer.camera
+        for suffix, writer in self.writers.items():
+            pixels = np.array(self.renderer.variant_frames[suffix])
+            writer.save_image(camera.get_image(pixels))
+
+
+class VariantRenderer(LayeredRenderer):
+    """
+    A LayeredRenderer writing one video per variant of a VariantScene.
+
+    Every run of mobjects is rasterized at most once per frame, on transparent
+    pixels, whatever the number of variants; the frame of a variant is its
+    background with the runs it shows composited on top.
+    """
+
+    opaque_background = False
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.variants = {"": {}}
+        # Last frame of each variant and the cairo context drawing on it, by suffix.
+        self.variant_frames = {}
+        self.variant_contexts = {}
+
+    def init_scene(self, scene):
+        if type(self.camera) is not scene.camera_class:
+            self.camera = scene.camera_class()
+        self.variants = scene.VARIANTS
+        scene_name = type(scene).__name__
+        self.file_writer = WriterGroup(
+            self,
+            {
+                suffix: self.variant_writer(scene_name, suffix)
+                for suffix in self.variants
+            },
+        )
+
+    def variant_writer(self, scene_name, suffix):
+        if not config["output_file"]:
+            return self._file_writer_class(self, scene_name + suffix)
+        # An explicit output file gets the suffix as well.
+        with tempconfig({"output_file": config["output_file"] + suffix}):
+            return self._file_writer_class(self, scene_name + suffix)
+
+    def layer_map(self, scene):
+        layers = {}
+        for name, mobjects in scene.optional_layers.items():
+            for mob in extract_mobject_family_members(mobjects):
+                layers[id(mob)] = name
+        return layers
+
+    def full_runs(self, scene, mobjects, include_submobjects):
+        """Runs redrawing mobjects (default: the whole scene) from scratch."""
+        if not mobjects:
+            mobjects = list_update(scene.mobjects, scene.foreground_mobjects)
+        if include_submobjects:
+            mobjects = extract_mobject_family_members(
+                mobjects,
+                use_z_index=self.camera.use_z_index,
+                only_those_with_points=True,
+            )
+        layers = self.layer_map(scene)
+        return [
+            (False, layer, list(group))
+            for layer, group in it.groupby(mobjects, lambda m: layers.get(id(m)))
+        ]
+
+    def variant_canvas(self, suffix, variant):
+        """The pixel array of a variant and its cairo context, reset to its background."""
+        if suffix not in self.variant_frames:
+            pixels = np.zeros_like(self.camera.pixel_array)
+            self.variant_frames[suffix] = pixels
+            self.variant_contexts[suffix] = cairo.Context(image_surface(pixels))
+        pixels = self.variant_frames[suffix]
+        background = variant.get("background")
+        if background is None:
+            pixels[:, :] = self.camera.background
+        else:
+            pixels[:, :] = color_to_int_rgba(background, self.camera.background_opacity)
+        return pixels, self.variant_contexts[suffix]
+
+    def update_frame(
+        self,
+        scene,
+        mobjects=None,
+        include_submobjects=True,
+        ignore_skipping=True,
+        **kwargs,
+    ):
+        if self.skip_animations and not ignore_skipping:
+            return
+        if self.runs is not None and mobjects is scene.moving_mobjects:
+            runs = self.runs
+        else:
+            runs = self.full_runs(scene, mobjects, include_submobjects)
+
+        # 1. Rasterize the moving runs once, for all the variants.
+        surfaces = [
+            (
+                layer,
+                content if static else image_surface(self.rasterize(content, False)),
+            )
+            for static, layer, content in runs
+        ]
+
+        # 2. Composite the runs each variant shows over its background.
+        for suffix, variant in self.variants.items():
+            pixels, ctx = self.variant_canvas(suffix, variant)
+            shown = variant.get("layers", ())
+            for layer, surface in surfaces:
+                if layer is None or layer in shown:
+                    paint(ctx, surface)
+
+        # The camera holds the first variant, for get_frame and get_image.
+        self.camera.set_pixel_array(self.variant_frames[next(iter(self.variants))])
+
+
+class VariantScene(LayeredScene):
+    """
+    A scene written to one video per entry of VARIANTS, from a single construct.
+
+    VARIANTS maps a suffix of the output name to the settings of a variant:
+      layers: the optional layers it shows (see optional); the others are left out.
+      background: its background color (default: the camera's).
+
+    For example, {"Grid": {"layers": ["grid"]}, "NoGrid": {}} on a scene named
+    VectorAddDiff writes VectorAddDiffGrid.mp4 and VectorAddDiffNoGrid.mp4. The
+    variants share every mobject, colors included. With another renderer the scene
+    renders once, with all of its optional layers.
+    """
+
+    VARIANTS = {"": {}}
+    renderer_class = VariantRenderer
+
+    def __init__(self, renderer=None, **kwargs):
+        # Optional layer name -> the mobjects put in it.
+        self.optional_layers = {}
+        super().__init__(renderer=renderer, **kwargs)
+
+    def optional(self, layer, mobject):
+        """Put mobject in an optional layer and return it."""
+        self.optional_layers.setdefault(layer, []).append(mobject)
+        return mobject
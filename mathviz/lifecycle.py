@@ -0,0 +1,107 @@
+"""
+Keeping long chained scenes in constant memory.
+
+Every step of animate_eq_transformation adds new token mobjects to the scene, and
+chained lessons (CombinedScene) keep adding more. MobjectTracker drops what can no
+longer be seen after each step (see prune_step) and reports what a scene keeps
+alive at the end of each section, so memory stays flat however many steps and
+lessons are chained.
+"""
+
+import gc
+import os
+
+from manim import VMobject, logger
+
+from mathviz.tex_cache import mobject_nbytes
+
+
+def current_rss():
+    """Resident set size of this process in bytes, or None where it is not available."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def is_invisible(mobject):
+    """True if nothing of mobject would be drawn (no points, or fully transparent)."""
+    for mob in mobject.get_family():
+        if not mob.has_points():
+            continue
+        if not isinstance(mob, VMobject):
+            return False
+        if mob.get_fill_opacities().any() or mob.get_stroke_opacities().any():
+            return False
+    return True
+
+
+class MobjectTracker:
+    """
+    Tracks the mobjects of a scene section by section.
+
+    Creating a tracker attaches it to the scene, so that prune_step(scene) prunes
+    after each step of a lesson. Call section_end(name) at the end of each section
+    (e.g. after fade_out): it prunes too, and records a report line with the number
+    of live mobjects, the size of their point/color data and the process RSS.
+    """
+
+    def __init__(self, scene):
+        self.scene = scene
+        self.reports = []
+        scene.mobject_tracker = self
+
+    def prune(self):
+        """Remove invisible top-level mobjects and those already drawn as part of another one."""
+        scene = self.scene
+        nested = set()
+        for mobject in scene.mobjects:
+            nested.update(id(m) for m in mobject.get_family()[1:])
+        kept = [
+            m for m in scene.mobjects if id(m) not in nested and not is_invisible(m)
+        ]
+        removed = len(scene.mobjects) - len(kept)
+        scene.mobjects = kept
+
+        # The last play call keeps its animations and their mobjects alive.
+        scene.animations = None
+        scene.moving_mobjects = []
+        scene.static_mobjects = []
+        gc.collect()
+        return removed
+
+    def step_end(self):
+        removed = self.prune()
+        logger.debug(f"step: {removed} mobjects pruned")
+        return removed
+
+    def snapshot(self, name):
+        family = self.scene.get_mobject_family_members()
+        report = {
+            "section": name,
+            "mobjects": len(family),
+            "bytes": sum(mobject_nbytes(m) for m in self.scene.mobjects),
+            "rss": current_rss(),
+        }
+        self.reports.append(report)
+        return report
+
+    def section_end(self, name):
+        removed = self.prune()
+        report = self.snapshot(name)
+        message = (
+            f"{name}: {report['mobjects']} live mobjects, "
+            f"{report['bytes'] / 1024:.0f} KiB of points, {removed} pruned"
+        )
+        if report["rss"] is not None:
+            message += f", RSS {report['rss'] / 2**20:.0f} MiB"
+        logger.info(message)
+        return report
+
+
+def prune_step(scene):
+    """Prune scene after a step if a MobjectTracker is attached to it."""
+    tracker = getattr(scene, "mobject_tracker", None)
+    if tracker is not None:
+        tracker.step_end()
@@ -0,0 +1,247 @@
+"""
+Where the time of a render goes, play by play.
+
+profile_scene() renders a scene with a ProfilingRenderer and writes a Chrome trace
+(JSON Trace Event Format), which both chrome://tracing and https://speedscope.app
+open. The timeline of the render is made of:
+
+- construct: the Python code between two plays (layout, building mobjects), with
+  the LaTeX compilations it triggered as tex spans;
+- play / wait: one span per self.play or self.wait, named after the line of scene
+  code that called it (animate_eq_transformation, say) and carrying the
+  animation types, the number of mobjects and the total time spent in each of:
+  - interpolate: updating the animations to the frame's time,
+  - rasterize: drawing the frame (static layers included),
+  - encode: handing the frame to the video encoder;
+  with one span per frame for each of them.
+- finish: combining the partial movie files.
+
+Usage, from the repository root:
+
+    python -m mathviz.profiling scenes.calcullit.main Mul1 --quality l
+"""
+
+import argparse
+import importlib
+import json
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from unittest import mock
+
+import manim
+from manim import Wait
+from manim.mobject.text import tex_mobject
+
+from mathviz.layers import LayeredRenderer
+from mathviz.render import configure
+from mathviz.tex_batch import prepare_tex
+
+MANIM_DIR = Path(manim.__file__).resolve().parent
+
+# Frames of these files are never reported as the caller of a play.
+INTERNAL_FILES = {
+    Path(__file__).resolve(),
+    Path(sys.modules[LayeredRenderer.__module__].__file__).resolve(),
+}
+
+
+def scene_caller():
+    """(function, file, line) of the innermost frame of scene code on the stack."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        path = Path(frame.f_code.co_filename).resolve()
+        if path not in INTERNAL_FILES and MANIM_DIR not in path.parents:
+            return frame.f_code.co_name, path.name, frame.f_lineno
+        frame = frame.f_back
+    return "?", "?", 0
+
+
+class Trace:
+    """Complete events ("ph": "X") of the Trace Event Format, in microseconds."""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.events = []
+
+    def now(self):
+        return (time.perf_counter() - self.origin) * 1e6
+
+    def add(self, name, category, start, end, **args):
+        self.events.append(
+            {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": start,
+                "dur": end - start,
+                "pid": 1,
+                "tid": 1,
+                "args": args,
+            }
+        )
+
+    @contextmanager
+    def span(self, name, category, **args):
+        start = self.now()
+        try:
+            yield args
+        finally:
+            self.add(name, category, start, self.now(), **args)
+
+    def save(self, path):
+        path = Path(path)
+        path.write_text(
+            json.dumps({"traceEvents": self.events, "displayTimeUnit": "ms"}),
+            encoding="utf-8",
+        )
+        return path
+
+
+class ProfilingRenderer(LayeredRenderer):
+    """A LayeredRenderer recording each play, and each frame's stages, in a Trace."""
+
+    def __init__(self, trace=None, **kwargs):
+        super().__init__(**kwargs)
+        self.trace = trace or Trace()
+        # Seconds spent per stage in the current play.
+        self.totals = defaultdict(float)
+        # Stages being timed; a stage calling itself (the static frame is drawn
+        # with update_frame) is only counted once.
+        self.active = set()
+        self.construct_start = None
+
+    def init_scene(self, scene):
+        super().init_scene(scene)
+        update_to_time = scene.update_to_time
+
+        def timed_update_to_time(t):
+            with self.stage("interpolate"):
+                update_to_time(t)
+
+        scene.update_to_time = timed_update_to_time
+
+    @contextmanager
+    def stage(self, name):
+        if name in self.active:
+            yield
+            return
+        self.active.add(name)
+        start = self.trace.now()
+        try:
+            yield
+        finally:
+            end = self.trace.now()
+            self.active.discard(name)
+            self.trace.add(name, "frame", start, end)
+            self.totals[name] += (end - start) / 1e6
+
+    def end_construct_span(self):
+        if self.construct_start is not None:
+            self.trace.add(
+                "construct", "python", self.construct_start, self.trace.now()
+            )
+        self.construct_start = None
+
+    def play(self, scene, *args, **kwargs):
+        function, filename, line = scene_caller()
+        self.end_construct_span()
+        self.totals.clear()
+        start = self.trace.now()
+        try:
+            super().play(scene, *args, **kwargs)
+        finally:
+            animations = scene.animations or []
+            is_wait = len(animations) == 1 and isinstance(animations[0], Wait)
+            self.trace.add(
+                f"{'wait' if is_wait else 'play'} {function} ({filename}:{line})",
+                "wait" if is_wait else "play",
+                start,
+                self.trace.now(),
+                caller=f"{filename}:{line}",
+                animations=[type(a).__name__ for a in animations],
+                mobjects=len(scene.get_mobject_family_members()),
+                skipped=self.skip_animations,
+                **{f"{k}_s": round(v, 6) for k, v in self.totals.items()},
+            )
+            self.construct_start = self.trace.now()
+
+    def save_static_frame_data(self, scene, static_mobjects):
+        with self.stage("rasterize"):
+            return super().save_static_frame_data(scene, static_mobjects)
+
+    def update_frame(self, scene, *args, **kwargs):
+        with self.stage("rasterize"):
+            return super().update_frame(scene, *args, **kwargs)
+
+    def add_frame(self, frame, num_frames=1):
+        with self.stage("encode"):
+            super().add_frame(frame, num_frames)
+
+    def scene_finished(self, scene):
+        self.end_construct_span()
+        with self.trace.span("finish", "encode"):
+            super().scene_finished(scene)
+
+
+@contextmanager
+def traced_tex(trace):
+    """Within this context, every tex_to_svg_file call is a tex span of trace."""
+    compile_tex = tex_mobject.tex_to_svg_file
+
+    def timed(expression, environment=None, tex_template=None):
+        with trace.span("tex", "tex", expression=expression[:80]):
+            return compile_tex(expression, environment, tex_template)
+
+    with mock.patch.object(tex_mobject, "tex_to_svg_file", timed):
+        yield
+
+
+def profile_scene(scene_cls, output=None, quality="l", batch_tex=False, **options):
+    """
+    Render scene_cls with a ProfilingRenderer and write its trace.
+
+    Parameters:
+      output: path of the trace (default: <scene name>.trace.json next to the video).
+      batch_tex: compile the tex strings in one LaTeX run first; off by default
+        so that tex compilation shows up where it happens.
+
+    Returns the path of the trace.
+    """
+    configure(quality, **options)
+    if batch_tex:
+        prepare_tex(scene_cls)
+    trace = Trace()
+    with traced_tex(trace):
+        with trace.span("setup", "python"):
+            scene = scene_cls(renderer=ProfilingRenderer(trace))
+        scene.renderer.construct_start = trace.now()
+        scene.render()
+    if output is None:
+        file_writer = scene.renderer.file_writer
+        video = getattr(file_writer, "movie_file_path", None) or Path(
+            scene_cls.__name__
+        )
+        output = Path(video).with_suffix(".trace.json")
+    return trace.save(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("module", help="e.g. scenes.calcullit.main")
+    parser.add_argument("scene", help="name of the Scene class")
+    parser.add_argument("--quality", default="l", help="l, m, h, p or k (as manim -q)")
+    parser.add_argument("--output", help="trace file (default: next to the video)")
+    parser.add_argument(
+        "--batch-tex", action="store_true", help="compile tex strings up front"
+    )
+    args = parser.parse_args()
+    module = importlib.import_module(args.module)
+    scene_cls = getattr(module, args.scene)
+    print(profile_scene(scene_cls, args.output, args.quality, args.batch_tex))
+
+
+if __name__ == "__main__":
+    main()
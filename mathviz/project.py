@@ -0,0 +1,194 @@
+"""
+The scenes of the project, what each of them depends on, and what was rendered.
+
+A scene's fingerprint covers the source of its class and of every function and
+class it uses from the project, followed transitively: editing
+animate_eq_transformation changes the fingerprint of every scene calling it,
+editing GridMixin the fingerprint of every BaseTransformationScene. Objects that
+come from outside the project (manim, numpy) are not followed; plain module-level
+values (numbers, strings, arrays) are included by value. A scene bound by a
+module-level assignment, such as CustomScene = generate_steps_scene(test_steps),
+also depends on that statement and on what it names: the function building the
+class and the values passed to it.
+
+The manifest records, per scene and quality, the fingerprint of the last render
+and the file it produced.
+"""
+
+import ast
+import inspect
+import json
+import os
+import sys
+import tempfile
+import textwrap
+from pathlib import Path
+
+import numpy as np
+
+from mathviz.cache import cache_dir, hash_key
+from mathviz.discovery import SCENES_DIR, module_name, scene_files
+from mathviz.render import module_scene_items
+
+# Module-level values included in fingerprints by value.
+PLAIN_TYPES = (bool, int, float, str, tuple, list, dict, np.ndarray)
+
+
+def project_root():
+    return Path.cwd().resolve()
+
+
+def is_project_object(obj, root):
+    """True for functions and classes whose source lives under root."""
+    if not (inspect.isfunction(obj) or inspect.isclass(obj)):
+        return False
+    try:
+        source_file = inspect.getsourcefile(obj)
+    except TypeError:
+        return False
+    return source_file is not None and Path(source_file).resolve().is_relative_to(root)
+
+
+def referenced_names(tree, namespace):
+    """The names of namespace (and attributes of its modules) used in an ast tree."""
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and node.id in namespace:
+            yield node.id, namespace[node.id]
+        elif isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name):
+            base = namespace.get(node.value.id)
+            if inspect.ismodule(base) and hasattr(base, node.attr):
+                yield f"{node.value.id}.{node.attr}", getattr(base, node.attr)
+
+
+def referenced_objects(obj):
+    """The globals (and attributes of global modules) named in obj's source."""
+    namespace = vars(sys.modules[obj.__module__])
+    tree = ast.parse(textwrap.dedent(inspect.getsource(obj)))
+    yield from referenced_names(tree, namespace)
+    if inspect.isclass(obj):
+        for base in obj.__bases__:
+            yield base.__name__, base
+
+
+def binding_statement(module, name):
+    """
+    The last module-level assignment to name in module's source, as an ast node,
+    or None when name is bound otherwise (by a class statement, say).
+    """
+    statement = None
+    for node in ast.parse(inspect.getsource(module)).body:
+        if isinstance(node, ast.Assign):
+            targets = node.targets
+        elif isinstance(node, ast.AnnAssign):
+            targets = [node.target]
+        else:
+            continue
+        if any(isinstance(t, ast.Name) and t.id == name for t in targets):
+            statement = node
+    return statement
+
+
+def scene_dependencies(scene_cls, root=None, scene_id=None):
+    """
+    The project functions and classes scene_cls depends on, itself included.
+
+    Parameters:
+      scene_id: "module:name" under which scene_cls is found (see project_scenes).
+        When the module binds it by an assignment, that statement is included
+        under the scene id, and what it names is followed.
+
+    Returns (sources, values): sources maps "module:qualname" to
+    (source file, source code), values maps "module:name" to the repr of the plain
+    module-level values they use.
+    """
+    root = root or project_root()
+    sources, values = {}, {}
+    pending = [scene_cls]
+
+    # 1. The assignment binding a generated scene, e.g. generate_steps_scene(steps).
+    if scene_id is not None:
+        module_id, name = scene_id.split(":")
+        module = sys.modules[module_id]
+        statement = binding_statement(module, name)
+        if statement is not None:
+            source_file = inspect.getsourcefile(module)
+            code = ast.get_source_segment(inspect.getsource(module), statement)
+            sources[scene_id] = (source_file, code)
+            for ref, value in referenced_names(statement.value, vars(module)):
+                if is_project_object(value, root):
+                    pending.append(value)
+                elif isinstance(value, PLAIN_TYPES):
+                    values[f"{module_id}:{ref}"] = repr(value)
+
+    # 2. The classes and functions used, followed transitively.
+    while pending:
+        obj = pending.pop()
+        key = f"{obj.__module__}:{obj.__qualname__}"
+        if key in sources:
+            continue
+        sources[key] = (inspect.getsourcefile(obj), inspect.getsource(obj))
+        for name, value in referenced_objects(obj):
+            if is_project_object(value, root):
+                pending.append(value)
+            elif isinstance(value, PLAIN_TYPES):
+                values[f"{obj.__module__}:{name}"] = repr(value)
+    return sources, values
+
+
+def fingerprint(scene_cls, root=None, scene_id=None):
+    """
+    Digest of everything in the project that scene_cls's video depends on; see
+    scene_dependencies for scene_id.
+    """
+    sources, values = scene_dependencies(scene_cls, root, scene_id)
+    return hash_key(
+        sorted((key, code) for key, (_, code) in sources.items()),
+        sorted(values.items()),
+    )
+
+
+def project_scenes(paths=(SCENES_DIR,)):
+    """
+    (scene id, scene class) for every scene defined under paths, the id being
+    "module:name" (see mathviz.render.module_scene_items).
+    """
+    for path in scene_files(paths):
+        module = module_name(path)
+        for name, scene_cls in module_scene_items(module):
+            yield f"{module}:{name}", scene_cls
+
+
+class Manifest:
+    """
+    What was rendered: "module:Scene" -> quality -> {"hash", "output"}.
+
+    Stored as one JSON file in the mathviz cache, written atomically.
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else cache_dir() / "render_manifest.json"
+        try:
+            self.entries = json.loads(self.path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.entries = {}
+
+    def is_fresh(self, scene_id, quality, digest):
+        """True if the last render of scene_id at quality matches digest and exists."""
+        entry = self.entries.get(scene_id, {}).get(quality)
+        return (
+            entry is not None
+            and entry["hash"] == digest
+            and Path(entry["output"]).exists()
+        )
+
+    def record(self, scene_id, quality, digest, output):
+        self.entries.setdefault(scene_id, {})[quality] = {
+            "hash": digest,
+            "output": str(output),
+        }
+
+    def save(self):
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,136 @@
+"""
+Rendering scenes from Python instead of the manim command line.
+
+These helpers change the global manim config, so they are meant to run in a worker
+process that renders one scene at a time.
+"""
+
+import importlib
+import inspect
+import subprocess
+from pathlib import Path
+
+from manim import Scene, config
+
+from mathviz.layers import LayeredRenderer
+from mathviz.tex_batch import prepare_tex, wants_batch
+
+# Same letters as the manim -q flag.
+QUALITY_FLAGS = {
+    "l": "low_quality",
+    "m": "medium_quality",
+    "h": "high_quality",
+    "p": "production_quality",
+    "k": "fourk_quality",
+}
+
+
+def configure(quality="l", **options):
+    """Set the quality (a -q letter or a manim quality name) and any other config options."""
+    config.quality = QUALITY_FLAGS.get(quality, quality)
+    for key, value in options.items():
+        config[key] = value
+
+
+def render_scene(scene_cls, quality="l", batch_tex=None, **options):
+    """
+    Render scene_cls in this process and return the path of the file it produced.
+
+    Static mobjects are rasterized once (see mathviz.layers).
+
+    Parameters:
+      scene_cls: the Scene subclass to render.
+      quality: a -q letter ("l", "m", "h", "p", "k") or a manim quality name.
+      batch_tex: compile all the scene's tex strings in one LaTeX run first
+        (see mathviz.tex_batch), which runs construct once more as a dry run.
+        By default, only scenes with BATCH_TEX = True are batched.
+      options: other manim config options, e.g. output_file or media_dir.
+    """
+    configure(quality, **options)
+    if wants_batch(scene_cls, batch_tex):
+        prepare_tex(scene_cls)
+    renderer_class = getattr(scene_cls, "renderer_class", LayeredRenderer)
+    scene = scene_cls(renderer=renderer_class())
+    scene.render()
+    file_writer = scene.renderer.file_writer
+    if hasattr(file_writer, "movie_file_path"):
+        return str(file_writer.movie_file_path)
+    return str(file_writer.image_file_path)
+
+
+def is_renderable(scene_cls):
+    """
+    False for scene classes only meant as bases: those setting ABSTRACT = True in
+    their own body, and those without a construct of their own or inherited from a
+    project class.
+    """
+    if vars(scene_cls).get("ABSTRACT", False):
+        return False
+    return scene_cls.construct is not Scene.construct
+
+
+def module_scene_items(module_name):
+    """
+    (name, scene class) for the renderable Scene subclasses defined in a module, in
+    source order. name is the module attribute the class is bound to, which differs
+    from the class name for classes made by a function (CustomScene in
+    scenes/calcullit/poc.py); "module:name" identifies a scene across the tools.
+    """
+    module = importlib.import_module(module_name)
+    items = {}
+    for name, obj in vars(module).items():
+        if (
+            inspect.isclass(obj)
+            and issubclass(obj, Scene)
+            and obj.__module__ == module.__name__
+            and is_renderable(obj)
+        ):
+            items.setdefault(obj, name)
+
+    def source_line(item):
+        try:
+            return inspect.getsourcelines(item[1])[1]
+        except (OSError, TypeError):
+            return 0
+
+    return sorted(((name, obj) for obj, name in items.items()), key=source_line)
+
+
+def module_scenes(module_name):
+    """The renderable Scene subclasses defined in a module, in source order."""
+    return [scene_cls for _, scene_cls in module_scene_items(module_name)]
+
+
+def concat_videos(paths, output):
+    """
+    Join videos with ffmpeg's concat demuxer, without re-encoding.
+
+    The inputs must share codec, resolution and frame rate, which is the case for
+    videos rendered with the same manim config.
+    """
+    output = Path(output)
+    list_file = output.with_suffix(".concat.txt")
+    list_file.write_text(
+        "".join(f"file '{Path(p).resolve().as_posix()}'\n" for p in paths),
+        encoding="utf-8",
+    )
+    command = [
+        "ffmpeg",
+        "-y",
+        "-loglevel",
+        "error",
+        "-f",
+        "concat",
+        "-safe",
+        "0",
+        "-i",
+        str(list_file),
+        "-c",
+        "copy",
+        str(output),
+    ]
+    try:
+        subprocess.run(command, check=True)
+    finally:
+        list_file.unlink()
+    return output
@@ -0,0 +1,142 @@
+"""
+Rendering some sections of a scene, fast-forwarding through the others.
+
+Scenes like PrimeFactorDecomposition call self.next_section() before each phase.
+render_sections() renders only the sections asked for, by index or by name: the
+plays of the other sections are skipped, i.e. run to their final state without any
+frame drawn or written, and construct stops after the last section asked for.
+
+Each section rendered is written to its own video (manim's save_sections, under
+media_dir/videos/<module>/<quality>/sections), and each play is still cached as a
+partial movie file keyed by what is on screen. After a fix to the comparison phase
+of PrimeFactorDecomposition, rendering that section again draws no frame of the
+decompositions before it.
+
+Usage, from the repository root:
+
+    python -m mathviz.sections scenes.prime_factor_decomposition \\
+        PrimeFactorDecomposition comparison --quality l
+"""
+
+import argparse
+import importlib
+
+from manim import config
+from manim.utils.exceptions import EndSceneEarlyException
+
+from mathviz.dry_run import NoSkippedFrames
+from mathviz.layers import LayeredRenderer
+from mathviz.render import configure
+from mathviz.tex_batch import prepare_tex, wants_batch
+
+
+class SectionRenderer(NoSkippedFrames, LayeredRenderer):
+    """
+    A LayeredRenderer that skips the animations of the sections not asked for,
+    without drawing any of their frames (see mathviz.dry_run.NoSkippedFrames).
+
+    Parameters:
+      sections: indices (0 is the section before the first next_section call) and
+        names of the sections to render; a name selects the first section with it.
+    """
+
+    def __init__(self, sections, **kwargs):
+        super().__init__(**kwargs)
+        self.indices = {s for s in sections if isinstance(s, int)}
+        self.names = {s for s in sections if isinstance(s, str)}
+
+    def is_wanted(self, index, name):
+        if name in self.names:
+            self.names.discard(name)
+            return True
+        return index in self.indices
+
+    def init_scene(self, scene):
+        super().init_scene(scene)
+        file_writer = self.file_writer
+
+        # 1. The first section is created with the file writer.
+        first = file_writer.sections[0]
+        if not self.is_wanted(0, first.name):
+            first.skip_animations = True
+            first.video = None
+        self.name_video(scene, 0)
+
+        # 2. Later ones are skipped as they start, or end construct when nothing
+        # asked for is left.
+        next_section = file_writer.next_section
+
+        def targeted_next_section(name, type_, skip_animations):
+            index = len(file_writer.sections)
+            if not self.names and all(i < index for i in self.indices):
+                raise EndSceneEarlyException()
+            wanted = self.is_wanted(index, name)
+            next_section(name, type_, skip_animations or not wanted)
+            self.name_video(scene, index)
+
+        file_writer.next_section = targeted_next_section
+
+    def save_static_frame_data(self, scene, static_mobjects):
+        # While skipping, NoSkippedFrames returns before LayeredRenderer resets its
+        # layers: forget those of the last play drawn.
+        self.runs = None
+        return super().save_static_frame_data(scene, static_mobjects)
+
+    def name_video(self, scene, index):
+        """
+        Name a section's video after the scene rather than the output file, so that
+        it does not depend on the other sections rendered with it.
+        """
+        section = self.file_writer.sections[index]
+        if section.video is not None:
+            extension = config.movie_file_extension
+            section.video = (
+                f"{type(scene).__name__}_{index:04}_{section.name}{extension}"
+            )
+
+    def section_videos(self):
+        """Paths of the videos of the sections rendered."""
+        file_writer = self.file_writer
+        return [
+            file_writer.sections_output_dir / section.video
+            for section in file_writer.sections
+            if section.video is not None
+        ]
+
+
+def render_sections(scene_cls, sections, quality="l", batch_tex=None, **options):
+    """
+    Render the given sections of scene_cls, one video each, and return their paths.
+
+    Parameters:
+      sections: indices and/or names of the sections (see SectionRenderer).
+      quality: a -q letter ("l", "m", "h", "p", "k") or a manim quality name.
+      batch_tex: compile all the scene's tex strings in one LaTeX run first
+        (default: the scene's BATCH_TEX, see mathviz.tex_batch).
+      options: other manim config options.
+    """
+    label = "_".join(map(str, sections))
+    options.setdefault("output_file", f"{scene_cls.__name__}_{label}")
+    configure(quality, save_sections=True, **options)
+    if wants_batch(scene_cls, batch_tex):
+        prepare_tex(scene_cls)
+    renderer = SectionRenderer(sections)
+    scene_cls(renderer=renderer).render()
+    return renderer.section_videos()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("module", help="e.g. scenes.prime_factor_decomposition")
+    parser.add_argument("scene", help="name of the Scene class")
+    parser.add_argument("sections", nargs="+", help="section indices or names")
+    parser.add_argument("--quality", default="l", help="l, m, h, p or k (as manim -q)")
+    args = parser.parse_args()
+    module = importlib.import_module(args.module)
+    sections = [int(s) if s.isdigit() else s for s in args.sections]
+    for path in render_sections(getattr(module, args.scene), sections, args.quality):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
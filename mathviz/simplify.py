@@ -0,0 +1,155 @@
+"""
+Step-by-step simplification with a bounded cost.
+
+sympy's simplify can take seconds on modest inputs. It therefore runs in a child
+process under a time budget, started from a fork server (or spawned) rather than
+forked from the render process, whose threads (see mathviz.streaming) could hold
+locks at the time of the fork; when the budget runs out the step falls back to
+cheaper rewrites, which run in this process. Finished derivations are cached on
+disk, keyed by the normalized input, so re-rendering a scene does no algebra at
+all; derivations where a fallback was used are not cached, so that a slow moment
+does not pin the degraded steps.
+"""
+
+import multiprocessing
+import queue
+
+from sympy import cancel, collect, expand, latex, simplify
+
+from mathviz.cache import JsonCache
+from mathviz.latex_parser import parse_expression
+from mathviz.terms import expression_latex
+
+# Seconds allowed for each rewrite attempt.
+DEFAULT_BUDGET = 2.0
+
+# Bump when the pipeline changes so that stale cache entries are ignored.
+PIPELINE_VERSION = 2
+
+
+def collect_terms(expr):
+    """collect() over every free symbol of expr, in a stable order."""
+    return collect(expr, sorted(expr.free_symbols, key=str))
+
+
+# Each step is (description, rewrites); the rewrites are tried in order, the most
+# thorough first, until one finishes within the budget.
+SIMPLIFICATION_PIPELINE = [
+    ("After Expansion", [expand]),
+    ("After Simplification", [simplify, cancel, collect_terms]),
+]
+
+# Rewrites that may take long enough to need a child process and a budget.
+BUDGETED_REWRITES = (simplify,)
+
+_steps_cache = JsonCache("simplification_steps")
+
+
+def normalize_latex(latex_str):
+    """Collapse whitespace so that cosmetic edits do not miss the cache."""
+    return " ".join(latex_str.split())
+
+
+def _run_rewrite(results, rewrite, expr):
+    try:
+        results.put((True, rewrite(expr)))
+    except Exception as e:
+        results.put((False, repr(e)))
+
+
+def rewrite_context():
+    """
+    The multiprocessing context of the rewrite processes: a fork server that has
+    imported sympy already where available, spawn otherwise.
+    """
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    ctx = multiprocessing.get_context("forkserver")
+    # Only takes effect when the server starts, i.e. on the first rewrite.
+    ctx.set_forkserver_preload([__name__])
+    return ctx
+
+
+def run_with_budget(rewrite, expr, budget=DEFAULT_BUDGET):
+    """
+    Compute rewrite(expr) in a child process (see rewrite_context).
+
+    Returns the rewritten expression, or None if the rewrite failed or did not
+    finish within budget seconds (the child is then terminated).
+    """
+    ctx = rewrite_context()
+    results = ctx.Queue()
+    worker = ctx.Process(
+        target=_run_rewrite, args=(results, rewrite, expr), daemon=True
+    )
+    worker.start()
+    try:
+        ok, value = results.get(timeout=budget)
+    except queue.Empty:
+        return None
+    finally:
+        worker.terminate()
+        worker.join()
+    return value if ok else None
+
+
+def run_inline(rewrite, expr):
+    """Compute rewrite(expr) in this process; None if it fails."""
+    try:
+        return rewrite(expr)
+    except Exception:
+        return None
+
+
+def apply_with_fallbacks(expr, rewrites, budget=DEFAULT_BUDGET):
+    """
+    Apply the first rewrite that succeeds, the budgeted ones within budget.
+
+    Returns (expression, fell_back): fell_back is True when the first rewrite did
+    not succeed, expression is expr itself when none did.
+    """
+    for i, rewrite in enumerate(rewrites):
+        if rewrite in BUDGETED_REWRITES:
+            result = run_with_budget(rewrite, expr, budget)
+        else:
+            result = run_inline(rewrite, expr)
+        if result is not None:
+            return result, i > 0
+    return expr, True
+
+
+def iter_simplification_steps(latex_str, budget=DEFAULT_BUDGET, use_cache=True):
+    """
+    Parse a LaTeX expression and yield the steps of its simplification as they are
+    computed, each a tuple (description, LaTeX of the expression at that step).
+
+    Parameters:
+      latex_str: the input expression.
+      budget: seconds allowed for each rewrite attempt (see SIMPLIFICATION_PIPELINE).
+      use_cache: read and write the on-disk cache of finished derivations.
+
+    The original expression is yielded before any rewrite runs, so a scene can start
+    drawing while the rest of the derivation is still being worked out. The cache
+    is written once the last step has been produced, unless a step fell back to a
+    cheaper rewrite.
+    """
+    key = [PIPELINE_VERSION, normalize_latex(latex_str)]
+    if use_cache:
+        cached = _steps_cache.get(key)
+        if cached is not None:
+            for step in cached:
+                yield tuple(step)
+            return
+
+    expr = parse_expression(latex_str)
+    steps = [("Original Expression", expression_latex(expr))]
+    yield steps[-1]
+    degraded = False
+    for description, rewrites in SIMPLIFICATION_PIPELINE:
+        expr, fell_back = apply_with_fallbacks(expr, rewrites, budget)
+        degraded = degraded or fell_back
+        steps.append((description, latex(expr)))
+        yield steps[-1]
+
+    if use_cache and not degraded:
+        _steps_cache.set(key, steps)
@@ -0,0 +1,302 @@
+"""
+Still images of a scene's final state, without rendering the video.
+
+Worksheets only need what is on screen at the end of a scene (or at the end of each
+of its sections). export_stills() runs construct with every animation skipped and
+no frame rasterized along the way, then draws the final state once, as PNG and/or as
+vector SVG or PDF.
+
+Usage, from the repository root:
+
+    python -m mathviz.stills scenes.calcullit.poc SimplificationScene1 --format png pdf
+
+Without scene names every scene defined in the module is exported.
+
+Posters and thumbnails may need another frame: ``--time 4.5`` writes the frame at
+4.5 s, ``--section 2`` (or a section name) the frame at the end of that section.
+seek_still() gets there the same way, with animations run to their final state
+without any frame drawn; only the play containing the requested time is
+interpolated to it, then that frame is drawn and construct stops. Updaters of the
+plays skipped over get one step per play instead of one per frame.
+"""
+
+import argparse
+from pathlib import Path
+
+import cairo
+from manim import VMobject, config, tempconfig
+from manim.utils.exceptions import EndSceneEarlyException
+
+from mathviz.dry_run import SkipRenderer
+from mathviz.render import configure, module_scenes
+from mathviz.tex_batch import prepare_tex, wants_batch
+
+FORMATS = ("png", "svg", "pdf")
+
+
+class StillRenderer(SkipRenderer):
+    """
+    A SkipRenderer that writes the frame at the end of the scene, and optionally at
+    the end of each section, to image files.
+
+    Parameters:
+      output_stem: path of the output files, without extension.
+      formats: any of "png", "svg" and "pdf".
+      per_section: also write the frame when a section ends (see Scene.next_section).
+    """
+
+    def __init__(self, output_stem, formats=("png",), per_section=False, **kwargs):
+        super().__init__(**kwargs)
+        self.output_stem = Path(output_stem)
+        self.formats = formats
+        self.per_section = per_section
+        self.written = []
+
+    def init_scene(self, scene):
+        super().init_scene(scene)
+        if not self.per_section:
+            return
+        next_section = self.file_writer.next_section
+
+        def write_then_next_section(*args, **kwargs):
+            self.write_still(scene)
+            next_section(*args, **kwargs)
+
+        self.file_writer.next_section = write_then_next_section
+
+    def scene_finished(self, scene):
+        self.write_still(scene)
+
+    def write_still(self, scene):
+        """Write the current frame; sections that end with an empty screen are skipped."""
+        if not scene.mobjects:
+            return
+        stem = self.output_stem
+        if self.per_section:
+            sections = self.file_writer.sections
+            stem = stem.with_name(
+                f"{stem.name}_{len(sections) - 1:04}_{sections[-1].name}"
+            )
+        stem.parent.mkdir(parents=True, exist_ok=True)
+
+        mobjects = scene.mobjects + scene.foreground_mobjects
+        for fmt in self.formats:
+            path = stem.with_suffix(f".{fmt}")
+            if fmt == "png":
+                self.update_frame(scene, mobjects=mobjects, ignore_skipping=True)
+                self.camera.get_image().save(path)
+            else:
+                self.write_vector(mobjects, path, fmt)
+            self.written.append(path)
+
+    def write_vector(self, mobjects, path, fmt):
+        """
+        Draw the vectorized mobjects to an SVG or PDF file.
+
+        The camera's own drawing code is used on a vector surface, so the output
+        matches the PNG; images and point clouds are not vector and are left out.
+        """
+        camera = self.camera
+        pw, ph = camera.pixel_width, camera.pixel_height
+        fw, fh = camera.frame_width, camera.frame_height
+        fc = camera.frame_center
+        surface_cls = cairo.SVGSurface if fmt == "svg" else cairo.PDFSurface
+        surface = surface_cls(str(path), pw, ph)
+        ctx = cairo.Context(surface)
+
+        ctx.set_source_rgba(
+            *camera.background_color.to_rgb(), camera.background_opacity
+        )
+        ctx.paint()
+        # Same transform as Camera.get_cairo_context.
+        ctx.set_matrix(
+            cairo.Matrix(
+                pw / fw,
+                0,
+                0,
+                -(ph / fh),
+                (pw / 2) - fc[0] * (pw / fw),
+                (ph / 2) + fc[1] * (ph / fh),
+            )
+        )
+        for mobject in camera.get_mobjects_to_display(mobjects):
+            if isinstance(mobject, VMobject):
+                camera.display_vectorized(mobject, ctx)
+        surface.finish()
+
+
+class SeekRenderer(StillRenderer):
+    """
+    A StillRenderer that writes one frame, at a time or at the end of a section,
+    and stops construct there.
+
+    Parameters:
+      output_stem: path of the output files, without extension.
+      formats: any of "png", "svg" and "pdf".
+      time: the time of the frame, in seconds; past the end, the last frame.
+      section: index or name of the section whose last frame is written.
+    """
+
+    def __init__(
+        self, output_stem, formats=("png",), time=None, section=None, **kwargs
+    ):
+        super().__init__(output_stem, formats, **kwargs)
+        self.seek_time = time
+        self.section = section
+
+    def init_scene(self, scene):
+        super().init_scene(scene)
+        self.scene = scene
+        play_internal = scene.play_internal
+
+        def seek_play_internal(skip_rendering=False):
+            # self.time already includes this play, skipped.
+            start = self.time - scene.duration
+            if self.seek_time is not None and self.seek_time < self.time:
+                scene.update_to_time(max(self.seek_time - start, 0))
+                self.write_still(scene)
+                raise EndSceneEarlyException()
+            play_internal(skip_rendering)
+
+        scene.play_internal = seek_play_internal
+        next_section = self.file_writer.next_section
+
+        def seek_next_section(*args, **kwargs):
+            if self.is_seeked_section():
+                self.write_still(scene)
+                raise EndSceneEarlyException()
+            next_section(*args, **kwargs)
+
+        self.file_writer.next_section = seek_next_section
+
+    def is_seeked_section(self):
+        sections = self.file_writer.sections
+        return self.section in (len(sections) - 1, sections[-1].name)
+
+    def freeze_current_frame(self, duration):
+        # A wait: the frame does not change until it ends.
+        if self.seek_time is not None and self.seek_time < self.time:
+            self.write_still(self.scene)
+            raise EndSceneEarlyException()
+        super().freeze_current_frame(duration)
+
+    def scene_finished(self, scene):
+        if self.written:
+            return
+        if self.section is None or self.is_seeked_section():
+            self.write_still(scene)
+
+
+def export_stills(
+    scene_cls,
+    output_dir=None,
+    formats=("png",),
+    per_section=False,
+    quality="k",
+    batch_tex=None,
+):
+    """
+    Write the final frame of scene_cls (or of each of its sections) to image files.
+
+    Parameters:
+      scene_cls: the Scene subclass to export.
+      output_dir: where to write the files, media_dir/stills by default.
+      formats: any of "png", "svg" and "pdf".
+      per_section: write one still per section instead of one for the scene.
+      quality: a -q letter or a manim quality name; sets the PNG resolution.
+      batch_tex: compile the scene's tex strings in one LaTeX run first
+        (default: the scene's BATCH_TEX, see mathviz.tex_batch).
+
+    Returns the paths written.
+    """
+    for fmt in formats:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown still format {fmt!r}, expected one of {FORMATS}")
+    configure(quality)
+    if wants_batch(scene_cls, batch_tex):
+        prepare_tex(scene_cls)
+    if output_dir is None:
+        output_dir = Path(config.get_dir("media_dir")) / "stills"
+
+    renderer = StillRenderer(
+        Path(output_dir) / scene_cls.__name__, formats, per_section
+    )
+    # No movie or image is written by manim itself.
+    with tempconfig({"dry_run": True}):
+        scene_cls(renderer=renderer).render()
+    return renderer.written
+
+
+def seek_still(
+    scene_cls,
+    time=None,
+    section=None,
+    output_dir=None,
+    formats=("png",),
+    quality="k",
+    batch_tex=None,
+):
+    """
+    Write the frame of scene_cls at time (in seconds) or at the end of section (an
+    index or a name), without drawing any frame before it.
+
+    The other parameters are those of export_stills. Returns the paths written.
+    """
+    if (time is None) == (section is None):
+        raise ValueError("Give either a time or a section")
+    configure(quality)
+    if wants_batch(scene_cls, batch_tex):
+        prepare_tex(scene_cls)
+    if output_dir is None:
+        output_dir = Path(config.get_dir("media_dir")) / "stills"
+
+    if time is not None:
+        suffix = f"t{time:g}s".replace(".", "_")
+    else:
+        suffix = f"section_{section}"
+    stem = Path(output_dir) / f"{scene_cls.__name__}_{suffix}"
+    renderer = SeekRenderer(stem, formats, time=time, section=section)
+    with tempconfig({"dry_run": True}):
+        scene_cls(renderer=renderer).render()
+    if not renderer.written:
+        where = f"section {section!r}" if time is None else f"{time:g}s"
+        raise ValueError(f"{scene_cls.__name__} has no frame to write at {where}")
+    return renderer.written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("module", help="e.g. scenes.calcullit.poc")
+    parser.add_argument("scenes", nargs="*", help="scene names (default: all)")
+    parser.add_argument("--format", nargs="+", default=["png"], choices=FORMATS)
+    parser.add_argument("--quality", default="k", help="l, m, h, p or k (as manim -q)")
+    parser.add_argument("--sections", action="store_true", help="one still per section")
+    parser.add_argument("--output", default=None, help="output directory")
+    parser.add_argument("--time", type=float, help="write the frame at this time (s)")
+    parser.add_argument(
+        "--section", help="write the last frame of this section (index or name)"
+    )
+    args = parser.parse_args()
+    section = args.section
+    if section is not None and section.isdigit():
+        section = int(section)
+
+    scenes = module_scenes(args.module)
+    if args.scenes:
+        by_name = {cls.__name__: cls for cls in scenes}
+        scenes = [by_name[name] for name in args.scenes]
+    for scene_cls in scenes:
+        if args.time is not None or section is not None:
+            paths = seek_still(
+                scene_cls, args.time, section, args.output, args.format, args.quality
+            )
+        else:
+            paths = export_stills(
+                scene_cls, args.output, args.format, args.sections, args.quality
+            )
+        for path in paths:
+            print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Overlap producing a scene's content with rendering it.
+
+prefetch() runs a producer (typically a generator of derivation steps) in a
+background thread, while the scene consumes its items one by one. sympy's heavy
+rewrites run in child processes (see mathviz.simplify), so the thread makes
+progress while the main thread renders the previous step.
+
+Mobjects are only built on the consuming thread: MathTex reads manim's global
+config and tex template and fills its caches, none of which is thread safe. The
+items produced ahead should therefore be plain data, such as the LaTeX of a step.
+"""
+
+import queue
+import threading
+
+_DONE = object()
+
+
+def _put(results, stop, entry):
+    """Put entry unless the consumer has gone away; return False in that case."""
+    while not stop.is_set():
+        try:
+            results.put(entry, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _produce(items, results, stop):
+    try:
+        for item in items:
+            if not _put(results, stop, (True, item)):
+                return
+        _put(results, stop, (True, _DONE))
+    except BaseException as e:
+        _put(results, stop, (False, e))
+
+
+def prefetch(items, prepare=None, depth=2):
+    """
+    Iterate over prepare(item) for each item, the items being computed ahead in a
+    background thread.
+
+    Parameters:
+      items: any iterable; it is consumed lazily, so the first item is yielded as soon
+        as it is ready rather than after the whole iterable is exhausted.
+      prepare: optional function applied to each item in the consuming thread, e.g.
+        building its mobject.
+      depth: how many items may wait ahead of the consumer.
+
+    Exceptions raised by items or prepare are re-raised in the consumer.
+    """
+    results = queue.Queue(maxsize=max(depth, 1))
+    stop = threading.Event()
+    worker = threading.Thread(target=_produce, args=(items, results, stop), daemon=True)
+    worker.start()
+    try:
+        while True:
+            ok, item = results.get()
+            if not ok:
+                raise item
+            if item is _DONE:
+                return
+            yield item if prepare is None else prepare(item)
+    finally:
+        # The consumer may stop early (or fail): let the worker exit.
+        stop.set()
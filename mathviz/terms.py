@@ -0,0 +1,242 @@
+"""
+Derivation steps and token groupings computed from the sympy term tree.
+
+The calcullit scenes describe every equation as a list of tokens plus color
+groupings mapping source tokens to target tokens. This module derives both from a
+sympy expression: each additive term becomes one token, and a source term is
+grouped with every target term that shares a monomial with its expansion.
+
+Steps of a derivation:
+  1. the original expression, as written;
+  2. products of sums written out factor by factor (only if there is a sum to
+     distribute);
+  3. each product evaluated;
+  4. like terms moved next to each other;
+  5. like terms combined.
+Steps that would not change the displayed tokens are skipped.
+"""
+
+import itertools
+
+from sympy import Add, Mul, Number, S, expand, latex
+
+
+def flatten_terms(expr):
+    """Additive terms of expr, in reading order (nested unevaluated sums are flattened)."""
+    if isinstance(expr, Add):
+        return [t for arg in expr.args for t in flatten_terms(arg)]
+    return [expr]
+
+
+def flatten_factors(expr):
+    """Multiplicative factors of expr, in reading order."""
+    if isinstance(expr, Mul):
+        return [f for arg in expr.args for f in flatten_factors(arg)]
+    return [expr]
+
+
+def factor_latex(factor, first=True):
+    """LaTeX for a single factor; sums, and negative factors after the first, get parentheses."""
+    tex = term_latex(factor) if isinstance(factor, Mul) else latex(factor)
+    if isinstance(factor, Add) or (not first and factor.could_extract_minus_sign()):
+        return f"\\left({tex}\\right)"
+    return tex
+
+
+def term_latex(term):
+    """
+    LaTeX for a term, keeping the factor structure it was written with.
+
+    A new factor group starts at every number or sum, so 3a * 4b * 2 is shown as
+    "3 a \\cdot 4 b \\cdot 2" rather than sympy's "3 a 4 b 2".
+    """
+    factors = flatten_factors(term)
+    sign = ""
+    if len(factors) > 1 and factors[0] == S.NegativeOne:
+        sign = "-"
+        factors = factors[1:]
+
+    groups = []
+    for factor in factors:
+        starts_group = isinstance(factor, (Number, Add)) or (
+            groups and isinstance(groups[-1][-1], Add)
+        )
+        if starts_group or not groups:
+            groups.append([factor])
+        else:
+            groups[-1].append(factor)
+
+    parts = []
+    for i, group in enumerate(groups):
+        if len(group) == 1:
+            parts.append(factor_latex(group[0], first=i == 0 and not sign))
+        else:
+            parts.append(" ".join(latex(f) for f in group))
+    return sign + " \\cdot ".join(parts)
+
+
+def product_latex(factors):
+    """LaTeX for an unevaluated product, a leading -1 being folded into the next factor."""
+    if len(factors) > 1 and factors[0] == S.NegativeOne:
+        factors = [-factors[1], *factors[2:]]
+    return " \\cdot ".join(factor_latex(f, first=i == 0) for i, f in enumerate(factors))
+
+
+def monomial(term):
+    """The term without its numeric coefficient (1 for constants)."""
+    return term.as_coeff_Mul()[1]
+
+
+def support(term):
+    """Monomials of the expanded term; two terms are related if their supports meet."""
+    return {monomial(t) for t in Add.make_args(expand(term)) if t != 0}
+
+
+def distribute(term):
+    """
+    Products obtained by distributing term over its sums, as tuples of factors.
+
+    The factors that are not sums stay together as one factor, placed where the
+    first of them was written: -4a(a - 2) gives (-4a, a) and (-4a, -2).
+    """
+    choices = []
+    block = []
+    block_index = None
+    for factor in flatten_factors(term):
+        if isinstance(factor, Add):
+            choices.append(flatten_terms(factor))
+        else:
+            if block_index is None:
+                block_index = len(choices)
+                choices.append(None)
+            block.append(factor)
+    if block:
+        choices[block_index] = [
+            block[0] if len(block) == 1 else Mul(*block, evaluate=False)
+        ]
+    return list(itertools.product(*choices))
+
+
+def derive_steps(expr):
+    """
+    Return the derivation of expr as a list of steps.
+
+    Each step is a list of (value, tex) pairs, one per additive term, where value is
+    the sympy term and tex its display string (without the joining sign).
+    """
+    original = [(t, term_latex(t)) for t in flatten_terms(expr)]
+    steps = [original]
+
+    combos = [combo for value, _ in original for combo in distribute(value)]
+    has_sums = any(
+        isinstance(f, Add) for value, _ in original for f in flatten_factors(value)
+    )
+    if has_sums:
+        written_out = [
+            (Mul(*combo), product_latex(combo))
+            for combo in combos
+            if len([f for f in combo if f != S.NegativeOne]) > 1
+        ]
+        if len(written_out) == len(combos):
+            steps.append(written_out)
+
+    evaluated = []
+    for combo in combos:
+        value = expand(Mul(*combo))
+        if value != 0:
+            evaluated.append((value, term_latex(value)))
+    steps.append(evaluated)
+
+    # Stable sort on the first appearance of each monomial.
+    order = {}
+    for value, _ in evaluated:
+        order.setdefault(monomial(value), len(order))
+    regrouped = sorted(evaluated, key=lambda term: order[monomial(term[0])])
+    steps.append(regrouped)
+
+    sums = {}
+    for value, _ in regrouped:
+        key = monomial(value)
+        sums[key] = sums.get(key, 0) + value
+    combined = [(v, term_latex(v)) for v in sums.values() if v != 0]
+    steps.append(combined or [(S.Zero, "0")])
+
+    # Drop steps that do not change what is shown.
+    result = [steps[0]]
+    for step in steps[1:]:
+        if [tex for _, tex in step] != [tex for _, tex in result[-1]]:
+            result.append(step)
+    return result
+
+
+def step_tokens(step, leading_equals):
+    """MathTex tokens for a step: one per term, signs included, optionally led by "="."""
+    tokens = ["="] if leading_equals else []
+    for i, (_, tex) in enumerate(step):
+        if i > 0 and not tex.startswith("-"):
+            tex = "+" + tex
+        tokens.append(tex)
+    return tokens
+
+
+def term_groups(source, target):
+    """
+    Group source terms with the target terms they turn into.
+
+    Returns a list of (source_indices, target_indices) pairs, one per connected
+    group of terms whose supports intersect, in order of their first target.
+    Indices refer to positions in the term lists.
+    """
+    parent = list(range(len(source) + len(target)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    source_supports = [support(value) for value, _ in source]
+    for j, (value, _) in enumerate(target):
+        target_support = support(value)
+        for i, src_support in enumerate(source_supports):
+            if src_support & target_support:
+                parent[find(i)] = find(len(source) + j)
+
+    groups = {}
+    for i in range(len(source)):
+        groups.setdefault(find(i), ([], []))[0].append(i)
+    for j in range(len(target)):
+        groups.setdefault(find(len(source) + j), ([], []))[1].append(j)
+    pairs = [g for g in groups.values() if g[0] and g[1]]
+    pairs.sort(key=lambda g: g[1][0])
+    return pairs
+
+
+def expression_latex(expr):
+    """LaTeX for a whole expression, each term shown as written (see term_latex)."""
+    return " ".join(
+        step_tokens([(t, term_latex(t)) for t in flatten_terms(expr)], False)
+    )
+
+
+def derive_transitions(expr):
+    """
+    Everything animate_eq_transformation needs to animate the derivation of expr.
+
+    Returns a list of (eq1_tokens, eq2_tokens, groups) triples, one per step, where
+    groups is a list of (eq1_indices, eq2_indices) pairs indexing the tokens (the
+    leading "=" of later steps included).
+    """
+    steps = derive_steps(expr)
+    transitions = []
+    for k in range(1, len(steps)):
+        source, target = steps[k - 1], steps[k]
+        offset = 1 if k > 1 else 0
+        groups = [
+            ([i + offset for i in src], [j + 1 for j in tgt])
+            for src, tgt in term_groups(source, target)
+        ]
+        transitions.append(
+            (step_tokens(source, k > 1), step_tokens(target, True), groups)
+        )
+    return transitions
@@ -0,0 +1,234 @@
+"""
+Compile all the tex strings of a scene in one LaTeX run.
+
+On a cache miss every MathTex runs its own latex and dvisvgm processes, once for
+the whole expression and once per token. prepare_tex() instead runs construct in a
+dry run (see mathviz.dry_run) to collect every tex string the scene needs, typesets
+them as the pages of a single document and splits that document with one dvisvgm
+call. Each page is stored where manim looks for it, so the real render finds all
+its SVGs already compiled.
+
+Only templates based on the standalone class (manim's default) can be batched; the
+strings of other templates are left to manim. When the batch fails to compile (a
+typo in one expression, say), nothing is stored and manim compiles the strings one
+by one as usual, reporting the error where it happens.
+
+The dry run executes construct a first time, which for most scenes costs about as
+much as the tex strings it saves compiling when they are cached already. Batching
+is therefore opt-in: a scene sets the class attribute BATCH_TEX = True to be
+batched before each of its renders, and the render helpers (render_scene,
+render_sections, export_stills, profile_scene) and mathviz render --batch-tex ask
+for it explicitly for any scene (see wants_batch). Scenes whose construct cannot
+run twice, such as one consuming a generator of steps (see generate_steps_scene
+in scenes/calcullit/poc.py), set BATCH_TEX = False and are never dry-run: their
+tex strings are compiled by manim during the render.
+"""
+
+import shutil
+import subprocess
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from unittest import mock
+
+from manim import config, logger
+from manim.mobject.text import tex_mobject
+from manim.utils.tex_file_writing import (
+    generate_tex_file,
+    make_tex_compilation_command,
+)
+
+from mathviz.dry_run import run_dry
+from mathviz.tex_cache import _default_cache
+
+STANDALONE = r"\documentclass[preview]{standalone}"
+BATCH_DOCUMENTCLASS = r"\documentclass[preview,multi=mathvizpage]{standalone}"
+BEGIN_DOCUMENT = r"\begin{document}"
+END_DOCUMENT = r"\end{document}"
+
+
+def placeholder_svg(directory, glyphs):
+    """
+    A stand-in SVG with one small square per glyph, used during the dry run.
+
+    Giving it about as many paths as the real expression has glyphs keeps the
+    per-token split of MathTex (and code indexing into it) working.
+    """
+    path = Path(directory) / f"placeholder_{glyphs}.svg"
+    if not path.exists():
+        squares = "".join(
+            f'<path d="M{2 * i} 0h1v1h-1z"/>' for i in range(max(glyphs, 1))
+        )
+        path.write_text(
+            '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 '
+            f'{2 * max(glyphs, 1)} 1">{squares}</svg>',
+            encoding="utf-8",
+        )
+    return path
+
+
+@contextmanager
+def placeholder_tex():
+    """
+    Within this context, MathTex and Tex never run LaTeX: strings that are not
+    compiled yet get a placeholder SVG (see placeholder_svg).
+
+    Yields a dict, filled with tex_file -> tex_template for every string built.
+    """
+    seen = {}
+
+    with tempfile.TemporaryDirectory() as placeholders:
+
+        def record(expression, environment=None, tex_template=None):
+            if tex_template is None:
+                tex_template = config["tex_template"]
+            tex_file = generate_tex_file(expression, environment, tex_template)
+            seen[tex_file] = tex_template
+            svg_file = tex_file.with_suffix(".svg")
+            if svg_file.exists():
+                return svg_file
+            return placeholder_svg(placeholders, len("".join(expression.split())))
+
+        # The built MathTex would be placeholders: keep them out of the memo.
+        _default_cache.clear()
+        try:
+            with mock.patch.object(tex_mobject, "tex_to_svg_file", record):
+                yield seen
+        finally:
+            _default_cache.clear()
+
+
+def wants_batch(scene_cls, batch_tex=None):
+    """
+    Whether to batch the tex strings of scene_cls before rendering it: batch_tex
+    when given, else the scene's BATCH_TEX (off when it does not set it).
+    """
+    if batch_tex is None:
+        return bool(getattr(scene_cls, "BATCH_TEX", False))
+    return batch_tex
+
+
+def scene_tex(scene_cls):
+    """
+    Dry-run scene_cls without LaTeX and return every tex file it builds, as a dict
+    tex_file -> tex_template (empty for scenes with BATCH_TEX = False).
+    """
+    if getattr(scene_cls, "BATCH_TEX", None) is False:
+        return {}
+    with placeholder_tex() as seen:
+        try:
+            run_dry(scene_cls)
+        except Exception as e:
+            # Whatever was collected before the failure is still worth compiling;
+            # the real render will report the error.
+            logger.warning(f"Dry run of {scene_cls.__name__} stopped early: {e!r}")
+    return seen
+
+
+def collect_tex(scene_cls):
+    """
+    Dry-run scene_cls and return the tex files it needs that are not compiled yet.
+
+    Returns a list of (tex_file, tex_template) pairs, one per distinct document.
+    """
+    return [
+        (tex_file, tex_template)
+        for tex_file, tex_template in scene_tex(scene_cls).items()
+        if not tex_file.with_suffix(".svg").exists()
+    ]
+
+
+def page_content(tex_file, tex_template):
+    """The part of a compiled tex file that goes into a page of the batch document."""
+    head, tail = tex_template.body.split(tex_template.placeholder_text, 1)
+    code = tex_file.read_text(encoding="utf-8")
+    return code[len(head) : len(code) - len(tail)]
+
+
+def batch_document(tex_template, contents):
+    """One standalone document with a page per content, or None if not batchable."""
+    head, tail = tex_template.body.split(tex_template.placeholder_text, 1)
+    if not head.startswith(STANDALONE) or tail.strip() != END_DOCUMENT:
+        return None
+    preamble, post_doc = head[len(STANDALONE) :].split(BEGIN_DOCUMENT, 1)
+    pages = "".join(
+        f"\\begin{{mathvizpage}}\n{content}\n\\end{{mathvizpage}}\n"
+        for content in contents
+    )
+    return "".join(
+        [BATCH_DOCUMENTCLASS, preamble, BEGIN_DOCUMENT, post_doc, pages, END_DOCUMENT]
+    )
+
+
+def compile_batch(tex_files, tex_template):
+    """
+    Compile tex_files (all written from tex_template) with one latex and one dvisvgm
+    run, storing each page as the SVG manim expects next to its tex file.
+
+    Returns the number of SVGs stored.
+    """
+    document = batch_document(
+        tex_template, [page_content(f, tex_template) for f in tex_files]
+    )
+    if document is None:
+        return 0
+
+    output_format = tex_template.output_format
+    with tempfile.TemporaryDirectory() as work:
+        work = Path(work)
+        batch_file = work / "batch.tex"
+        batch_file.write_text(document, encoding="utf-8")
+
+        command = make_tex_compilation_command(
+            tex_template.tex_compiler, output_format, batch_file, work
+        )
+        if subprocess.run(command, stdout=subprocess.DEVNULL).returncode != 0:
+            logger.warning(
+                "Batch LaTeX compilation failed; compiling tex strings one by one."
+            )
+            return 0
+
+        subprocess.run(
+            [
+                "dvisvgm",
+                *(["--pdf"] if output_format == ".pdf" else []),
+                "--page=1-",
+                "--no-fonts",
+                "--verbosity=0",
+                f"--output={(work / 'page-%p').as_posix()}",
+                batch_file.with_suffix(output_format).as_posix(),
+            ],
+            stdout=subprocess.DEVNULL,
+        )
+        pages = sorted(work.glob("page-*.svg"), key=lambda p: int(p.stem[5:]))
+        if len(pages) != len(tex_files):
+            logger.warning(
+                f"Batch produced {len(pages)} pages for {len(tex_files)} tex strings; "
+                "compiling them one by one."
+            )
+            return 0
+        for page, tex_file in zip(pages, tex_files):
+            shutil.move(page, tex_file.with_suffix(".svg"))
+    return len(pages)
+
+
+def prepare_tex(scene_cls):
+    """
+    Compile every tex string scene_cls needs before it is rendered.
+
+    Returns the number of SVGs compiled in batch. Uses the current manim config
+    (media_dir, tex_template), so call it after configuring the render.
+    """
+    groups = {}
+    for tex_file, tex_template in collect_tex(scene_cls):
+        key = (tex_template.body, tex_template.tex_compiler, tex_template.output_format)
+        groups.setdefault(key, (tex_template, []))[1].append(tex_file)
+
+    compiled = 0
+    for tex_template, tex_files in groups.values():
+        compiled += compile_batch(tex_files, tex_template)
+    if compiled:
+        logger.info(
+            f"Compiled {compiled} tex strings for {scene_cls.__name__} in batch"
+        )
+    return compiled
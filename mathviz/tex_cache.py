@@ -0,0 +1,95 @@
+"""
+Memoized MathTex construction.
+
+Building a MathTex parses the compiled SVG and splits it into one submobject per
+token. That is the slow part even when the LaTeX output is already cached on disk,
+and chained derivations rebuild the same token lists over and over. MathTexCache
+builds each distinct expression once and hands out copies of it.
+"""
+
+from collections import OrderedDict
+
+from manim import DEFAULT_FONT_SIZE, MathTex, config
+
+
+def mobject_nbytes(mobject):
+    """Approximate size in bytes of the point and color arrays of a mobject family."""
+    total = 0
+    for mob in mobject.get_family():
+        total += mob.points.nbytes
+        for attr in ("fill_rgbas", "stroke_rgbas", "background_stroke_rgbas"):
+            data = getattr(mob, attr, None)
+            if data is not None:
+                total += data.nbytes
+    return total
+
+
+class MathTexCache:
+    """
+    A bounded LRU of built MathTex mobjects.
+
+    Entries are keyed by (tokens, tex template, font size). The cached mobjects are
+    never handed out directly: get() returns a copy, so callers are free to color,
+    move or transform the result.
+
+    Parameters:
+      max_entries: maximum number of expressions kept.
+      max_bytes: maximum total size of the kept mobjects (see mobject_nbytes).
+         The least recently used entries are evicted first.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (mobject, nbytes)
+
+    def get(self, *tokens, tex_template=None, font_size=DEFAULT_FONT_SIZE):
+        """Return a fresh MathTex(*tokens), building it only on a cache miss."""
+        if tex_template is None:
+            tex_template = config["tex_template"]
+        # TexTemplate is not hashable; its full body identifies it.
+        key = (tuple(tokens), tex_template.body, tex_template.tex_compiler, font_size)
+
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            mobject = MathTex(*tokens, tex_template=tex_template, font_size=font_size)
+            entry = (mobject, mobject_nbytes(mobject))
+            self._entries[key] = entry
+            self.total_bytes += entry[1]
+            self._evict()
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return entry[0].copy()
+
+    def clear(self):
+        self._entries.clear()
+        self.total_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _evict(self):
+        while self._entries and (
+            len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes
+        ):
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            self.total_bytes -= nbytes
+
+
+_default_cache = MathTexCache()
+
+
+def cached_math_tex(*tokens, tex_template=None, font_size=DEFAULT_FONT_SIZE):
+    """
+    Drop-in replacement for MathTex(*tokens) backed by a process-wide MathTexCache.
+
+    Repeated token lists (e.g. the same equation used as the target of one step and
+    the source of the next, or sub-scenes chained in CombinedScene) skip SVG parsing
+    and submobject splitting entirely.
+    """
+    return _default_cache.get(*tokens, tex_template=tex_template, font_size=font_size)
@@ -0,0 +1,151 @@
+"""
+Animating one step of a derivation: from an equation to the next one below it.
+
+animate_eq_transformation is shared by the hand-written lessons of
+scenes/calcullit, the generated exercises (mathviz.exercises) and the derivations
+(mathviz.derivation): the tokens of eq1 move into the tokens of eq2 they are
+grouped with by color, the others fade in.
+"""
+
+from manim import DOWN, LEFT, FadeIn, LaggedStart, ReplacementTransform, VGroup
+
+from mathviz.align import auto_groupings
+from mathviz.lifecycle import prune_step
+from mathviz.tex_cache import cached_math_tex
+from mathviz.validate import check_groupings
+
+
+def animate_eq_transformation(
+    scene,
+    eq1_tokens,
+    eq1_groupings,
+    eq2_tokens,
+    eq2_groupings,
+    buff=0.5,
+    wait_time=1,
+    starting_eq=None,
+    lag_ratio=None,
+):
+    """
+    Create and display eq1 and eq2, then animate a transformation between them.
+
+    Parameters:
+      scene: the Scene instance (i.e. self in construct).
+      eq1_tokens: list of strings for eq1 tokens (used in MathTex).
+      eq1_groupings: dict mapping color (e.g. BLUE) -> list of indices for eq1 tokens to transform.
+      eq2_tokens: list of strings for eq2 tokens.
+      eq2_groupings: dict mapping color -> list of indices for eq2 tokens.
+         Pass None for both groupings to compute them from the tokens (see mathviz.align).
+      buff: vertical spacing between equations.
+      wait_time: time to wait after each step.
+      starting_eq: an existing MathTex to use as eq1 (if chaining transformations).
+      lag_ratio: if None, each group transform is played on its own. Otherwise all group
+         transforms are played together as a single LaggedStart with this lag ratio
+         (0 plays them simultaneously).
+
+    Behavior:
+      1. If starting_eq is None, creates eq1 uncolored, adds it to the scene, and animates its colorization.
+         Otherwise, uses starting_eq as eq1 (already in the desired state).
+      2. Creates eq2, positions it below eq1, and fades in tokens not targeted by any grouping.
+      3. Animates the transformation for each color group from eq1 to eq2, either one
+         play per target token or one LaggedStart for the whole step (see lag_ratio).
+      4. Replaces the tokens of eq2 added one by one with a single group of them, and
+         prunes the scene if it has a MobjectTracker (see mathviz.lifecycle). Tokens
+         of eq2 that were neither faded in nor transformed stay off screen.
+    Returns:
+      (eq1, eq2): the MathTex objects.
+    """
+    # 1. Use the existing eq1 if provided; otherwise, create it.
+    if starting_eq is None:
+        eq1 = cached_math_tex(*eq1_tokens)
+        scene.add(eq1)
+        scene.wait(wait_time)
+    else:
+        eq1 = starting_eq
+
+    if eq1_groupings is None and eq2_groupings is None:
+        eq1_groupings, eq2_groupings = auto_groupings(eq1_tokens, eq2_tokens)
+
+    # Check the groupings against the compiled equations before animating anything.
+    eq2 = cached_math_tex(*eq2_tokens)
+    eq1_groupings, eq2_groupings = check_groupings(
+        eq1, eq1_groupings, eq2, eq2_groupings
+    )
+
+    # Animate colorizing eq1 according to eq1_groupings.
+    color_anims = []
+    for color, indices in eq1_groupings.items():
+        for i in indices:
+            color_anims.append(eq1[i].animate.set_color(color))
+    if color_anims:
+        scene.play(*color_anims)
+    scene.wait(wait_time)
+
+    # 2. Color eq2 and position it below eq1.
+    for color, indices in eq2_groupings.items():
+        for i in indices:
+            eq2[i].set_color(color)
+    eq2.next_to(eq1, DOWN, buff=buff, aligned_edge=LEFT)
+
+    # Fade in any tokens of eq2 that are not part of any grouping.
+    transformed_indices = set()
+    for indices in eq2_groupings.values():
+        transformed_indices.update(indices)
+    non_transformed_tokens = VGroup(
+        *[eq2[i] for i in range(len(eq2)) if i not in transformed_indices]
+    )
+    if non_transformed_tokens:
+        scene.play(FadeIn(non_transformed_tokens))
+    scene.wait(wait_time)
+
+    # 3. Animate the transformation for each color group in eq2 order.
+    all_transforms = []
+    for color, src_indices in eq1_groupings.items():
+        tgt_indices = eq2_groupings.get(color, [])
+        # Sort indices for left-to-right order.
+        src_sorted = sorted(src_indices)
+        tgt_sorted = sorted(tgt_indices)
+        # If multiple source tokens must merge into one target:
+        if len(tgt_sorted) == 1 and len(src_sorted) > 1:
+            all_transforms.append(
+                (
+                    tgt_sorted[0],
+                    VGroup(*[eq1[i] for i in src_sorted]),
+                    eq2[tgt_sorted[0]],
+                )
+            )
+        else:
+            for i, tgt in enumerate(tgt_sorted):
+                if i < len(src_sorted):
+                    src = src_sorted[i]
+                else:
+                    src = src_sorted[-1]
+                all_transforms.append((tgt, eq1[src], eq2[tgt]))
+    # Sort transformations by target token index.
+    all_transforms.sort(key=lambda tup: tup[0])
+    if lag_ratio is None:
+        for _, src_obj, tgt_obj in all_transforms:
+            scene.play(ReplacementTransform(src_obj.copy(), tgt_obj))
+    elif all_transforms:
+        # A single play call renders the whole step as one segment.
+        scene.play(
+            LaggedStart(
+                *[
+                    ReplacementTransform(src_obj.copy(), tgt_obj)
+                    for _, src_obj, tgt_obj in all_transforms
+                ],
+                lag_ratio=lag_ratio,
+            )
+        )
+
+    scene.wait(wait_time)
+
+    # 4. Keep the tokens of eq2 that were animated on screen as one mobject, and drop
+    # the copies and groups that were only needed to animate them.
+    # Grouped tokens of eq2 with no source were never animated.
+    hidden_indices = transformed_indices.difference(tgt for tgt, _, _ in all_transforms)
+    shown = VGroup(*[eq2[i] for i in range(len(eq2)) if i not in hidden_indices])
+    scene.remove(*shown, non_transformed_tokens)
+    scene.add(shown)
+    prune_step(scene)
+    return eq1, eq2
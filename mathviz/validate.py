@@ -0,0 +1,168 @@
+"""
+Check a module's scenes for token indexing mistakes before rendering them.
+
+A wrong index in the groupings given to animate_eq_transformation, or in a
+hardcoded eq[i], only shows up (or silently mis-animates) once the render reaches
+that step. validate_module() dry-runs every scene of a module without LaTeX and
+without rasterizing, so it takes seconds, and reports every problem it finds:
+
+- grouping indices out of range for the compiled equation,
+- source tokens that map to no target token,
+- grouped target tokens that have no source (they never appear),
+- any exception raised by construct, e.g. an IndexError from eq[i].
+
+Usage, from the repository root:
+
+    python -m mathviz.validate scenes.calcullit.main [SceneName ...]
+
+The exit status is 1 when a problem is found.
+"""
+
+import argparse
+import inspect
+import sys
+import traceback
+from pathlib import Path
+
+from manim import logger
+
+from mathviz.dry_run import run_dry
+from mathviz.render import module_scenes
+from mathviz.tex_batch import placeholder_tex
+
+# Problems of the scene being validated, or None outside of validate_scene.
+_problems = None
+
+
+def grouping_problems(eq1_len, eq1_groupings, eq2_len, eq2_groupings):
+    """
+    Describe what is wrong with a pair of groupings (see animate_eq_transformation).
+
+    Parameters:
+      eq1_len, eq2_len: number of tokens of the compiled equations (len(eq)).
+      eq1_groupings, eq2_groupings: dicts mapping color -> list of token indices.
+    """
+    problems = []
+    for name, length, groupings in (
+        ("eq1", eq1_len, eq1_groupings),
+        ("eq2", eq2_len, eq2_groupings),
+    ):
+        for color, indices in groupings.items():
+            bad = [i for i in indices if not -length <= i < length]
+            if bad:
+                problems.append(
+                    f"{name} indices {bad} ({color}) out of range for {length} tokens"
+                )
+
+    for color, src in eq1_groupings.items():
+        tgt = eq2_groupings.get(color, [])
+        if src and not tgt:
+            problems.append(f"eq1 tokens {sorted(src)} ({color}) map to no eq2 token")
+        elif len(tgt) > 1 and len(src) > len(tgt):
+            # Only the first len(tgt) sources are transformed.
+            unused = sorted(src)[len(tgt) :]
+            problems.append(f"eq1 tokens {unused} ({color}) map to no eq2 token")
+    for color, tgt in eq2_groupings.items():
+        if tgt and not eq1_groupings.get(color):
+            problems.append(
+                f"eq2 tokens {sorted(tgt)} ({color}) have no source and never appear"
+            )
+    return problems
+
+
+def check_groupings(eq1, eq1_groupings, eq2, eq2_groupings):
+    """
+    Check groupings against the compiled equations; called by animate_eq_transformation.
+
+    Out-of-range indices raise an IndexError naming them all, other problems are
+    logged. While validating, problems are recorded instead and the groupings are
+    returned without the out-of-range indices, so the dry run goes on to the next
+    steps.
+
+    Returns (eq1_groupings, eq2_groupings).
+    """
+    problems = grouping_problems(len(eq1), eq1_groupings, len(eq2), eq2_groupings)
+    if not problems:
+        return eq1_groupings, eq2_groupings
+
+    if _problems is None:
+        message = "; ".join(problems)
+        if any("out of range" in p for p in problems):
+            raise IndexError(message)
+        logger.warning(f"Groupings: {message}")
+        return eq1_groupings, eq2_groupings
+
+    # Blame the line that called animate_eq_transformation.
+    caller = inspect.stack(0)[2]
+    location = f"{Path(caller.filename).name}:{caller.lineno}"
+    _problems.extend(f"{location} {p}" for p in problems)
+
+    def in_range(groupings, length):
+        return {
+            color: [i for i in indices if -length <= i < length]
+            for color, indices in groupings.items()
+        }
+
+    return in_range(eq1_groupings, len(eq1)), in_range(eq2_groupings, len(eq2))
+
+
+def error_location(error, scene_cls):
+    """file:line of the innermost frame of error in scene_cls's source file."""
+    source = inspect.getsourcefile(scene_cls)
+    frames = traceback.extract_tb(error.__traceback__)
+    for frame in reversed(frames):
+        if frame.filename == source:
+            return f"{Path(frame.filename).name}:{frame.lineno}"
+    frame = frames[-1]
+    return f"{Path(frame.filename).name}:{frame.lineno}"
+
+
+def validate_scene(scene_cls):
+    """Dry-run scene_cls without LaTeX and return the list of problems found."""
+    global _problems
+    _problems = []
+    try:
+        with placeholder_tex():
+            run_dry(scene_cls)
+    except Exception as e:
+        _problems.append(
+            f"{error_location(e, scene_cls)} {type(e).__name__}: {e} "
+            "(construct stopped here)"
+        )
+    finally:
+        problems, _problems = _problems, None
+    return problems
+
+
+def validate_module(module_name, scene_names=None):
+    """
+    Validate the scenes of a module (all of them, or those named) and print a report.
+
+    Returns a dict mapping scene name -> problems.
+    """
+    scenes = module_scenes(module_name)
+    if scene_names:
+        scenes = [cls for cls in scenes if cls.__name__ in scene_names]
+
+    report = {}
+    for scene_cls in scenes:
+        problems = validate_scene(scene_cls)
+        report[scene_cls.__name__] = problems
+        status = f"{len(problems)} problem(s)" if problems else "ok"
+        print(f"{scene_cls.__name__}: {status}")
+        for problem in problems:
+            print(f"  {problem}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("module", help="e.g. scenes.calcullit.main")
+    parser.add_argument("scenes", nargs="*", help="scene names (default: all)")
+    args = parser.parse_args()
+    report = validate_module(args.module, args.scenes)
+    sys.exit(1 if any(report.values()) else 0)
+
+
+if __name__ == "__main__":
+    main()
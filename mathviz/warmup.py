@@ -0,0 +1,123 @@
+"""
+Warm up the LaTeX cache of whole scene modules on every core.
+
+The first render of a module spends most of its time compiling tex strings one
+after the other. warm_up() dry-runs each scene (see mathviz.tex_batch.scene_tex)
+to collect the exact documents MathTex and Tex will ask for, then compiles the
+missing ones in a pool of worker threads: latex runs concurrently, and a semaphore
+limits how many dvisvgm conversions write to the cache directory at the same time.
+Text mobjects do not use LaTeX; the dry run builds them for real, which caches them.
+
+Usage, from the repository root:
+
+    python -m mathviz.warmup scenes.calcullit.main scenes.isocoord.main --workers 8
+
+Afterwards the cache coverage of every scene is printed.
+"""
+
+import argparse
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from manim import config
+from manim.utils.tex_file_writing import (
+    compile_tex,
+    convert_to_svg,
+    delete_nonsvg_files,
+)
+
+from mathviz.render import module_scene_items
+from mathviz.tex_batch import scene_tex
+
+
+def is_compiled(tex_file):
+    return tex_file.with_suffix(".svg").exists()
+
+
+def compile_one(tex_file, tex_template, disk):
+    """Compile one tex file to the SVG manim expects; disk bounds the dvisvgm step."""
+    if is_compiled(tex_file):
+        return
+    dvi_file = compile_tex(
+        tex_file, tex_template.tex_compiler, tex_template.output_format
+    )
+    with disk:
+        convert_to_svg(dvi_file, tex_template.output_format)
+
+
+def compile_all(documents, workers=None, disk_slots=2):
+    """
+    Compile documents (tex_file -> tex_template) concurrently.
+
+    Parameters:
+      workers: number of latex processes running at once (default: one per core).
+      disk_slots: number of dvisvgm conversions writing at once.
+
+    Returns the list of tex files that failed to compile.
+    """
+    disk = threading.BoundedSemaphore(disk_slots)
+    failed = []
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = {
+            pool.submit(compile_one, tex_file, tex_template, disk): tex_file
+            for tex_file, tex_template in documents.items()
+        }
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception:
+                failed.append(futures[future])
+    # Cleaning up while other jobs run would delete their intermediate files.
+    if not config["no_latex_cleanup"]:
+        delete_nonsvg_files()
+    return failed
+
+
+def warm_up(module_names, workers=None, disk_slots=2):
+    """
+    Compile every tex string used by the scenes of the given modules, then print the
+    cache coverage per scene.
+
+    Returns a dict mapping scene id ("module:name", as scenes of the same name exist
+    in several modules) -> (compiled, total) tex strings.
+    """
+    per_scene = {}
+    for module_name in module_names:
+        for name, scene_cls in module_scene_items(module_name):
+            per_scene[f"{module_name}:{name}"] = scene_tex(scene_cls)
+
+    documents = {}
+    for seen in per_scene.values():
+        documents.update(seen)
+    missing = {f: t for f, t in documents.items() if not is_compiled(f)}
+    print(
+        f"{len(documents)} distinct tex strings in {len(per_scene)} scenes, "
+        f"{len(missing)} to compile"
+    )
+    failed = compile_all(missing, workers, disk_slots)
+    for tex_file in failed:
+        print(f"failed: {tex_file}")
+
+    coverage = {}
+    for name, seen in per_scene.items():
+        compiled = sum(is_compiled(f) for f in seen)
+        coverage[name] = (compiled, len(seen))
+        percent = 100 * compiled / len(seen) if seen else 100
+        print(f"{name}: {compiled}/{len(seen)} tex strings cached ({percent:.0f}%)")
+    return coverage
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("modules", nargs="+", help="e.g. scenes.calcullit.main")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument(
+        "--disk", type=int, default=2, help="concurrent dvisvgm conversions"
+    )
+    args = parser.parse_args()
+    warm_up(args.modules, args.workers, args.disk)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""
+Re-rendering the scenes affected by each edit, as files are saved.
+
+    mathviz watch [paths...] [--quality l] [--workers N]
+
+At start, every scene is imported once to build a dependency graph: for each
+project function and class (see mathviz.project.scene_dependencies), the scenes
+that use it. When a .py file under the watched paths (scenes/ and mathviz/ by
+default) is saved, its top-level functions and classes are compared with their
+previous source using ast, and only the scenes depending on one that changed are
+rendered again, at preview quality. Each batch runs in fresh processes, so that
+the new code is the one rendered. Scenes whose own class was just edited go first.
+
+Files are watched with inotify on Linux, by polling modification times elsewhere.
+"""
+
+import ast
+import ctypes
+import ctypes.util
+import importlib
+import multiprocessing
+import os
+import select
+import struct
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from mathviz.discovery import SCENES_DIR, SceneIndex, module_name, scene_files
+
+WATCHED = (SCENES_DIR, "mathviz")
+
+# inotify event masks (see inotify(7)).
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_ISDIR = 0x40000000
+EVENT = struct.Struct("iIII")
+
+# Time given to an editor to finish writing before changes are read.
+DEBOUNCE = 0.1
+
+
+class Inotify:
+    """The .py files changed under some directories, from Linux's inotify."""
+
+    MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+    def __init__(self, paths):
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        # Watch descriptor -> directory.
+        self.directories = {}
+        for path in map(Path, paths):
+            for directory in [path, *path.rglob("*")]:
+                if directory.is_dir():
+                    self.add(directory)
+
+    def add(self, directory):
+        if directory.name == "__pycache__":
+            return
+        wd = self.libc.inotify_add_watch(self.fd, str(directory).encode(), self.MASK)
+        if wd >= 0:
+            self.directories[wd] = directory
+
+    def wait(self, timeout=None):
+        """Block until something changes; returns the changed .py files."""
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return set()
+        time.sleep(DEBOUNCE)
+        changed = set()
+        while select.select([self.fd], [], [], 0)[0]:
+            data = os.read(self.fd, 65536)
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT.unpack_from(data, offset)
+                offset += EVENT.size
+                name = data[offset : offset + length].rstrip(b"\0").decode()
+                offset += length
+                path = self.directories.get(wd, Path(".")) / name
+                if mask & IN_ISDIR:
+                    if mask & IN_CREATE:
+                        self.add(path)
+                elif path.suffix == ".py":
+                    changed.add(path)
+        return changed
+
+
+class Poller:
+    """The .py files changed under some paths, by comparing modification times."""
+
+    def __init__(self, paths, interval=0.5):
+        self.paths = paths
+        self.interval = interval
+        self.mtimes = self.scan()
+
+    def scan(self):
+        return {path: path.stat().st_mtime for path in scene_files(self.paths)}
+
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while deadline is None or time.monotonic() < deadline:
+            time.sleep(self.interval)
+            mtimes = self.scan()
+            changed = {
+                path
+                for path in set(mtimes) | set(self.mtimes)
+                if mtimes.get(path) != self.mtimes.get(path)
+            }
+            self.mtimes = mtimes
+            if changed:
+                return changed
+        return set()
+
+
+def file_watcher(paths):
+    if sys.platform.startswith("linux"):
+        try:
+            return Inotify(paths)
+        except (OSError, AttributeError):
+            pass
+    return Poller(paths)
+
+
+def top_level_sources(path):
+    """
+    The source of each top-level function and class of a file, by name, and the
+    source of everything else (imports, constants) as one string.
+    """
+    text = Path(path).read_text(encoding="utf-8")
+    tree = ast.parse(text)
+    objects, rest = {}, []
+    for node in tree.body:
+        segment = ast.get_source_segment(text, node)
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            objects[node.name] = segment
+        else:
+            rest.append(segment)
+    return objects, "\n".join(rest)
+
+
+def render_and_trace(module_name, scene_name, quality):
+    """
+    Worker entry point: render one scene, return its output path and the keys of
+    the objects it depends on now.
+    """
+    from mathviz.project import scene_dependencies
+    from mathviz.render import render_scene
+
+    module = importlib.import_module(module_name)
+    scene_cls = getattr(module, scene_name)
+    output = render_scene(scene_cls, quality, input_file=module.__file__)
+    sources, _ = scene_dependencies(scene_cls, scene_id=f"{module_name}:{scene_name}")
+    return output, sorted(sources)
+
+
+class DependencyGraph:
+    """For each "module:qualname" object of the project, the scenes that use it."""
+
+    def __init__(self):
+        self.dependents = defaultdict(set)
+
+    def build(self, paths):
+        from mathviz.project import project_scenes, scene_dependencies
+
+        for scene_id, scene_cls in project_scenes(paths):
+            sources, _ = scene_dependencies(scene_cls, scene_id=scene_id)
+            self.update(scene_id, sources)
+
+    def update(self, scene_id, keys):
+        for scenes in self.dependents.values():
+            scenes.discard(scene_id)
+        for key in keys:
+            self.dependents[key].add(scene_id)
+
+    def affected(self, module, names):
+        """Scenes depending on the named objects of module."""
+        scenes = set()
+        for name in names:
+            scenes |= self.dependents.get(f"{module}:{name}", set())
+        return scenes
+
+    def module_dependents(self, module):
+        """Scenes depending on anything defined in module."""
+        prefix = f"{module}:"
+        return {
+            scene
+            for key, scenes in self.dependents.items()
+            if key.startswith(prefix)
+            for scene in scenes
+        }
+
+
+def changed_scenes(path, previous, current, graph):
+    """
+    Scene ids to render after path went from previous to current (see
+    top_level_sources), with the ids whose own class changed.
+    """
+    module = module_name(path)
+    old_objects, old_rest = previous
+    new_objects, new_rest = current
+    changed = {
+        name
+        for name in set(old_objects) | set(new_objects)
+        if old_objects.get(name) != new_objects.get(name)
+    }
+    if old_rest != new_rest:
+        # Imports or module-level values changed: anything from the module may.
+        scenes = graph.module_dependents(module)
+    else:
+        scenes = graph.affected(module, changed)
+
+    # Scenes of this file whose class changed, including new ones.
+    edited = {
+        f"{module}:{scene['name']}"
+        for scene in SceneIndex().scenes(path)
+        if scene["name"] in changed
+    }
+    return scenes | edited, edited
+
+
+def render_batch(scene_ids, quality, workers, graph):
+    """Render scene_ids in fresh processes, in order, and update the graph."""
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = {
+            pool.submit(render_and_trace, *scene_id.split(":"), quality): scene_id
+            for scene_id in scene_ids
+        }
+        for future in as_completed(futures):
+            scene_id = futures[future]
+            try:
+                output, keys = future.result()
+            except Exception as e:
+                print(f"failed: {scene_id}: {e}")
+                continue
+            graph.update(scene_id, keys)
+            print(f"rendered: {scene_id} -> {output}")
+
+
+def watch(paths=WATCHED, quality="l", workers=None):
+    """Render the scenes affected by each change under paths until interrupted."""
+    paths = [p for p in paths if Path(p).exists()]
+    scene_paths = [p for p in paths if Path(p).resolve() != Path("mathviz").resolve()]
+    graph = DependencyGraph()
+    graph.build(scene_paths)
+    print(f"watching {', '.join(paths)} ({len(graph.dependents)} tracked objects)")
+
+    snapshots = {path: top_level_sources(path) for path in scene_files(paths)}
+    watcher = file_watcher(paths)
+    while True:
+        # Scene id -> priority: edited scenes first, then the latest changes.
+        pending = {}
+        for path in watcher.wait():
+            previous = snapshots.get(path, ({}, ""))
+            try:
+                current = top_level_sources(path)
+            except (FileNotFoundError, SyntaxError):
+                continue
+            snapshots[path] = current
+            scenes, edited = changed_scenes(path, previous, current, graph)
+            edited_at = path.stat().st_mtime
+            for scene_id in scenes:
+                priority = (scene_id not in edited, -edited_at)
+                pending[scene_id] = min(priority, pending.get(scene_id, priority))
+        if pending:
+            order = sorted(pending, key=pending.get)
+            print(f"{len(order)} scene(s) affected: {', '.join(order)}")
+            render_batch(order, quality, workers, graph)
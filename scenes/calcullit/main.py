@@ -1,7 +1,13 @@
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
 import sympy
 from manim import *
+from mathviz.lifecycle import MobjectTracker
+from mathviz.render import concat_videos, render_scene
+from mathviz.tex_cache import cached_math_tex
+from mathviz.transform import animate_eq_transformation
 from sympy import expand, latex, simplify
-from sympy.parsing.latex import parse_latex
 
 
 class Mul1(Scene):
@@ -72,103 +78,6 @@ class Mul1(Scene):
         self.wait(3)
 
 
-def animate_eq_transformation(
-    scene,
-    eq1_tokens,
-    eq1_groupings,
-    eq2_tokens,
-    eq2_groupings,
-    buff=0.5,
-    wait_time=1,
-    starting_eq=None,
-):
-    """
-    Create and display eq1 and eq2, then animate a transformation between them.
-
-    Parameters:
-      scene: the Scene instance (i.e. self in construct).
-      eq1_tokens: list of strings for eq1 tokens (used in MathTex).
-      eq1_groupings: dict mapping color (e.g. BLUE) -> list of indices for eq1 tokens to transform.
-      eq2_tokens: list of strings for eq2 tokens.
-      eq2_groupings: dict mapping color -> list of indices for eq2 tokens.
-      buff: vertical spacing between equations.
-      wait_time: time to wait after each step.
-      starting_eq: an existing MathTex to use as eq1 (if chaining transformations).
-
-    Behavior:
-      1. If starting_eq is None, creates eq1 uncolored, adds it to the scene, and animates its colorization.
-         Otherwise, uses starting_eq as eq1 (already in the desired state).
-      2. Creates eq2, positions it below eq1, and fades in tokens not targeted by any grouping.
-      3. Animates the transformation for each color group from eq1 to eq2.
-    Returns:
-      (eq1, eq2): the MathTex objects.
-    """
-    # 1. Use the existing eq1 if provided; otherwise, create it.
-    if starting_eq is None:
-        eq1 = MathTex(*eq1_tokens)
-        scene.add(eq1)
-        scene.wait(wait_time)
-    else:
-        eq1 = starting_eq
-
-    # Animate colorizing eq1 according to eq1_groupings.
-    color_anims = []
-    for color, indices in eq1_groupings.items():
-        for i in indices:
-            color_anims.append(eq1[i].animate.set_color(color))
-    scene.play(*color_anims)
-    scene.wait(wait_time)
-
-    # 2. Create eq2 and position it below eq1.
-    eq2 = MathTex(*eq2_tokens)
-    for color, indices in eq2_groupings.items():
-        for i in indices:
-            eq2[i].set_color(color)
-    eq2.next_to(eq1, DOWN, buff=buff, aligned_edge=LEFT)
-
-    # Fade in any tokens of eq2 that are not part of any grouping.
-    transformed_indices = set()
-    for indices in eq2_groupings.values():
-        transformed_indices.update(indices)
-    non_transformed_tokens = VGroup(
-        *[eq2[i] for i in range(len(eq2)) if i not in transformed_indices]
-    )
-    if non_transformed_tokens:
-        scene.play(FadeIn(non_transformed_tokens))
-    scene.wait(wait_time)
-
-    # 3. Animate the transformation for each color group in eq2 order.
-    all_transforms = []
-    for color, src_indices in eq1_groupings.items():
-        tgt_indices = eq2_groupings.get(color, [])
-        # Sort indices for left-to-right order.
-        src_sorted = sorted(src_indices)
-        tgt_sorted = sorted(tgt_indices)
-        # If multiple source tokens must merge into one target:
-        if len(tgt_sorted) == 1 and len(src_sorted) > 1:
-            all_transforms.append(
-                (
-                    tgt_sorted[0],
-                    VGroup(*[eq1[i] for i in src_sorted]),
-                    eq2[tgt_sorted[0]],
-                )
-            )
-        else:
-            for i, tgt in enumerate(tgt_sorted):
-                if i < len(src_sorted):
-                    src = src_sorted[i]
-                else:
-                    src = src_sorted[-1]
-                all_transforms.append((tgt, eq1[src], eq2[tgt]))
-    # Sort transformations by target token index.
-    all_transforms.sort(key=lambda tup: tup[0])
-    for _, src_obj, tgt_obj in all_transforms:
-        scene.play(ReplacementTransform(src_obj.copy(), tgt_obj))
-
-    scene.wait(wait_time)
-    return eq1, eq2
-
-
 class Mul2(Scene):
     def construct(self):
         # Example: Multiply "-2 a b ⋅ 3 a^2 b" becomes "= -6 a^3 b^2"
@@ -201,7 +110,7 @@ class Mul2(Scene):
             PURPLE: [3],  # b and ^2 (purple)
         }
 
-        eq1 = MathTex(*eq1_tokens)
+        eq1 = cached_math_tex(*eq1_tokens)
         self.add(eq1)
         self.wait(1)
 
@@ -248,6 +157,7 @@ class SimpleDistrib1(Scene):
             eq2_groupings,
             buff=0.5,
             wait_time=1,
+            lag_ratio=0.5,
         )
 
         # Second transformation: use previous eq2 (as eq1) --> eq3.
@@ -268,6 +178,7 @@ class SimpleDistrib1(Scene):
             eq3_groupings,
             buff=0.5,
             wait_time=1,
+            lag_ratio=0.5,
             starting_eq=eq2_obj,
         )
         self.wait(3)
@@ -313,6 +224,7 @@ class DoubleDistrib1(Scene):
             eq2_groupings,
             buff=0.5,
             wait_time=1,
+            lag_ratio=0.5,
         )
 
         # # Second transformation: use previous eq2 (as eq1) --> eq3.
@@ -342,6 +254,7 @@ class DoubleDistrib1(Scene):
             eq3_groupings,
             buff=0.5,
             wait_time=1,
+            lag_ratio=0.5,
             starting_eq=eq2_obj,
         )
 
@@ -364,6 +277,7 @@ class DoubleDistrib1(Scene):
             eq4_groupings,
             buff=0.5,
             wait_time=1,
+            lag_ratio=0.5,
             starting_eq=eq3_obj,
         )
 
@@ -528,17 +442,54 @@ def fade_out(scene: Scene):
     scene.play(*animations)
 
 
+# The lessons played one after another by CombinedScene.
+COMBINED_SCENES = [
+    Add1,
+    Mul1,
+    Mul2,
+    MinusParenthesis1,
+    MinusParenthesis2,
+    SimpleDistrib1,
+    DoubleDistrib1,
+]
+
+
 class CombinedScene(Scene):
     def construct(self):
-        scenes = [
-            Add1,
-            Mul1,
-            Mul2,
-            MinusParenthesis1,
-            MinusParenthesis2,
-            SimpleDistrib1,
-            DoubleDistrib1,
-        ]
-        for scene in scenes:
+        tracker = MobjectTracker(self)
+        for scene in COMBINED_SCENES:
             scene.construct(self)
             fade_out(self)
+            tracker.section_end(scene.__name__)
+
+
+def render_segment(scene_cls, quality="l"):
+    """
+    Render scene_cls followed by fade_out, i.e. its part of CombinedScene, and return
+    the path of the video.
+    """
+
+    class Segment(Scene):
+        def construct(self):
+            scene_cls.construct(self)
+            fade_out(self)
+
+    Segment.__name__ = Segment.__qualname__ = f"{scene_cls.__name__}Segment"
+    return render_scene(Segment, quality, output_file=Segment.__name__)
+
+
+def render_combined_in_parallel(quality="l", workers=None):
+    """
+    Render CombinedScene with one worker process per sub-scene, then join the segments
+    without re-encoding. Wall time is close to that of the longest sub-scene.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        segments = list(
+            pool.map(render_segment, COMBINED_SCENES, [quality] * len(COMBINED_SCENES))
+        )
+    return concat_videos(segments, Path(segments[0]).with_name("CombinedScene.mp4"))
+
+
+if __name__ == "__main__":
+    # poetry run python -m scenes.calcullit.main
+    print(render_combined_in_parallel())
@@ -1,30 +1,15 @@
-import sympy
-from manim import *
-from sympy import expand, latex, simplify
-from sympy.parsing.latex import parse_latex
-
-
-def get_simplification_steps(latex_str):
-    """
-    Parse a LaTeX expression into a Sympy expression and return a list of steps,
-    where each step is a tuple (description, LaTeX representation of the expression).
-    """
-    # Parse the LaTeX input into a Sympy expression.
-    expr = parse_latex(latex_str)
+from collections.abc import Iterator
 
-    steps = []
-    # Step 1: Original expression.
-    steps.append(("Original Expression", latex(expr)))
-
-    # Step 2: Expanded expression.
-    expanded_expr = expand(expr)
-    steps.append(("After Expansion", latex(expanded_expr)))
-
-    # Step 3: Simplified expression.
-    simplified_expr = simplify(expanded_expr)
-    steps.append(("After Simplification", latex(simplified_expr)))
+from manim import *
+from mathviz.simplify import iter_simplification_steps
+from mathviz.streaming import prefetch
+from mathviz.transform import animate_eq_transformation
 
-    return steps
+# iter_simplification_steps(latex_str) yields (description, LaTeX) steps as they are
+# computed. Each rewrite runs under a time budget and the finished steps are cached
+# on disk, so re-rendering the scenes below does not redo the algebra.
+# prefetch() computes the next step in a background thread while the current one is
+# being animated; its MathTex is built on the main thread when it is its turn.
 
 
 class StepByStepScene(Scene):
@@ -35,19 +20,22 @@ class StepByStepScene(Scene):
     To use, override the INPUT_EXPRESSION class variable.
     """
 
+    ABSTRACT = True  # Only subclasses are rendered (see mathviz.render).
     INPUT_EXPRESSION = r""  # Override this in subclasses with the desired LaTeX string.
 
     def construct(self):
-        # Get the simplification steps as a list of (description, expression) tuples.
-        steps = get_simplification_steps(self.INPUT_EXPRESSION)
+        # Stream the simplification steps, computed ahead of time.
+        steps = prefetch(
+            iter_simplification_steps(self.INPUT_EXPRESSION),
+            lambda step: MathTex(f"{step[0]}: {step[1]}"),
+        )
 
         # Starting position for the first step.
         start_pos = 3 * UP
         step_objects = []
 
-        # Create and animate each step.
-        for description, expr in steps:
-            step_tex = MathTex(f"{description}: {expr}")
+        # Animate each step as soon as it is ready.
+        for step_tex in steps:
             if not step_objects:
                 # For the first step, position at the top.
                 step_tex.move_to(start_pos)
@@ -66,14 +54,23 @@ def generate_steps_scene(steps_list):
     """
     Given a list of steps (each either a MathTex object or a LaTeX string),
     return a new Scene class that displays each step one below the previous one.
+
+    steps_list may also be a generator of LaTeX strings, consumed while the scene
+    renders: step k+1 is computed while step k is being written. A generator can
+    only be rendered once, so such scenes are never dry-run to batch their LaTeX
+    first, even when asked to (BATCH_TEX, see mathviz.tex_batch).
     """
 
+    def to_mobject(step):
+        # If the step is a string, create a MathTex object; otherwise, assume it's already a MathTex.
+        return MathTex(step) if isinstance(step, str) else step
+
     class CustomStepsScene(Scene):
+        BATCH_TEX = False if isinstance(steps_list, Iterator) else None
+
         def construct(self):
             step_objects = []
-            for step in steps_list:
-                # If the step is a string, create a MathTex object; otherwise, assume it's already a MathTex.
-                step_obj = MathTex(step) if isinstance(step, str) else step
+            for step_obj in prefetch(steps_list, to_mobject):
                 if not step_objects:
                     step_obj.to_edge(UP)
                 else:
@@ -325,107 +322,6 @@ class SimpleDistrib1(Scene):
         self.wait(1)
 
 
-def animate_eq_transformation(
-    scene, 
-    eq1_tokens, eq1_groupings, 
-    eq2_tokens, eq2_groupings, 
-    buff=0.5, wait_time=1,
-    starting_eq=None
-):
-    """
-    Create and display eq1 and eq2, then animate a transformation between them.
-    
-    Parameters:
-      scene: the Scene instance (i.e. self in construct).
-      eq1_tokens: list of strings for eq1 tokens (used in MathTex).
-      eq1_groupings: dict mapping color (e.g. BLUE) -> list of indices for eq1 tokens to transform.
-      eq2_tokens: list of strings for eq2 tokens.
-      eq2_groupings: dict mapping color -> list of indices for eq2 tokens.
-      buff: vertical spacing between equations.
-      wait_time: time to wait after each step.
-      starting_eq: an existing MathTex to use as eq1 (if chaining transformations).
-    
-    Behavior:
-      1. If starting_eq is None, creates eq1 uncolored, adds it to the scene, and animates its colorization.
-         Otherwise, uses starting_eq as eq1 (already in the desired state).
-      2. Creates eq2, positions it below eq1, and fades in tokens not targeted by any grouping.
-      3. Animates the transformation for each color group from eq1 to eq2.
-    Returns:
-      (eq1, eq2): the MathTex objects.
-    """
-    # 1. Use the existing eq1 if provided; otherwise, create it.
-    if starting_eq is None:
-        eq1 = MathTex(*eq1_tokens)
-        scene.add(eq1)
-        scene.wait(wait_time)
-    else:
-        eq1 = starting_eq
-
-    # Animate colorizing eq1 according to eq1_groupings.
-    color_anims = []
-    for color, indices in eq1_groupings.items():
-        for i in indices:
-            color_anims.append(eq1[i].animate.set_color(color))
-    scene.play(*color_anims)
-    scene.wait(wait_time)
-
-    # 2. Create eq2 and position it below eq1.
-    eq2 = MathTex(*eq2_tokens)
-    for color, indices in eq2_groupings.items():
-        for i in indices:
-            eq2[i].set_color(color)
-    eq2.next_to(eq1, DOWN, buff=buff, aligned_edge=LEFT)
-    
-
-    # Fade in any tokens of eq2 that are not part of any grouping.
-    transformed_indices = set()
-    for indices in eq2_groupings.values():
-        transformed_indices.update(indices)
-    non_transformed_tokens = VGroup(*[eq2[i] for i in range(len(eq2)) if i not in transformed_indices])
-    if non_transformed_tokens:
-        scene.play(FadeIn(non_transformed_tokens))
-    scene.wait(wait_time)
-    
-    # 3. Animate the transformation for each color group.
-    # for color, src_indices in eq1_groupings.items():
-    #     tgt_indices = eq2_groupings.get(color, [])
-    #     if len(src_indices) >= len(tgt_indices):
-    #         group1 = VGroup(*[eq1[i] for i in src_indices])
-    #         group2 = VGroup(*[eq2[i] for i in tgt_indices])
-    #         scene.play(ReplacementTransform(group1.copy(), group2))
-    #     elif len(src_indices) == 1 and len(tgt_indices) > 1:
-    #         for tgt in tgt_indices:
-    #             scene.play(ReplacementTransform(eq1[src_indices[0]].copy(), eq2[tgt]))
-    #     else:
-    #         for i in range(min(len(src_indices), len(tgt_indices))):
-    #             scene.play(ReplacementTransform(eq1[src_indices[i]].copy(), eq2[tgt_indices[i]]))
-
-    # 4. Animate the transformation for each color group in eq2 order.
-    all_transforms = []
-    for color, src_indices in eq1_groupings.items():
-        tgt_indices = eq2_groupings.get(color, [])
-        # Sort indices for left-to-right order.
-        src_sorted = sorted(src_indices)
-        tgt_sorted = sorted(tgt_indices)
-        # If multiple source tokens must merge into one target:
-        if len(tgt_sorted) == 1 and len(src_sorted) > 1:
-            all_transforms.append((tgt_sorted[0], VGroup(*[eq1[i] for i in src_sorted]), eq2[tgt_sorted[0]]))
-        else:
-            for i, tgt in enumerate(tgt_sorted):
-                if i < len(src_sorted):
-                    src = src_sorted[i]
-                else:
-                    src = src_sorted[-1]
-                all_transforms.append((tgt, eq1[src], eq2[tgt]))
-    # Sort transformations by target token index.
-    all_transforms.sort(key=lambda tup: tup[0])
-    for _, src_obj, tgt_obj in all_transforms:
-        scene.play(ReplacementTransform(src_obj.copy(), tgt_obj))
-
-    scene.wait(wait_time)
-    return eq1, eq2
-
-
 class Mul3(Scene):
     def construct(self):
         # Example: Multiply "-2 a b ⋅ 3 a^2 b" becomes "= -6 a^3 b^2"
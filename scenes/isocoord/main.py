@@ -1,5 +1,7 @@
 from manim import *
 
+from mathviz.layers import LayeredScene
+
 
 def drawGrid(self):
     # Create the axes
@@ -39,7 +41,7 @@ def drawGrid(self):
     self.play(FadeIn(self.xyPlane))
 
 
-class Sx(Scene):
+class Sx(LayeredScene):
     def construct(self):
 
         title = Text("Symétrie orthogonale d'axe x", font_size=36)
@@ -133,7 +135,7 @@ class Sx(Scene):
         return final_text
 
 
-class Sy(Scene):
+class Sy(LayeredScene):
     def construct(self):
         # Write the title at the beginning
         title = Text("Symétrie orthogonale d'axe y", font_size=36)
@@ -220,7 +222,7 @@ class Sy(Scene):
         return final_text
 
 
-class So(Scene):
+class So(LayeredScene):
     def construct(self):
         # Write the title at the beginning
         title = Text("Symétrie centrale de centre O(0, 0)", font_size=36)
@@ -327,7 +329,7 @@ class So(Scene):
         return final_text
 
 
-class Rop(Scene):
+class Rop(LayeredScene):
     def construct(self):
         # Write the title at the beginning
         title = Text("Rotation de centre O(0, 0), \n et d'ampliture +90°", font_size=36)
@@ -434,7 +436,7 @@ class Rop(Scene):
         return final_text
 
 
-class Ron(Scene):
+class Ron(LayeredScene):
     def construct(self):
         # Write the title at the beginning
         title = Text("Rotation de centre O(0, 0), \n et d'ampliture -90°", font_size=36)
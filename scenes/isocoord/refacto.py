@@ -1,5 +1,7 @@
 from manim import *
 
+from mathviz.layers import LayeredScene
+
 ##############################################################################
 # 1) A small helper/mixin to draw the axes + grid
 ##############################################################################
@@ -43,7 +45,7 @@ class GridMixin:
 ##############################################################################
 
 
-class BaseTransformationScene(Scene, GridMixin):
+class BaseTransformationScene(LayeredScene, GridMixin):
     """
     A base class that covers:
       - Title
@@ -52,6 +54,8 @@ class BaseTransformationScene(Scene, GridMixin):
     Subclasses override 'get_title_text()', 'get_prefix()', 'transform_func()', etc.
     """
 
+    ABSTRACT = True  # Only subclasses are rendered (see mathviz.render).
+
     def get_title_text(self):
         """Override in subclasses."""
         return "Default Transformation Title"
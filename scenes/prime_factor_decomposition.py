@@ -6,7 +6,7 @@ from manim import *
 
 class PrimeFactorDecomposition(Scene):
     def construct(self):
-        self.next_section()
+        self.next_section("primes")
         # List of primes under 20
         self.primes = [2, 3, 5, 7, 11, 13, 17, 19]
         primes_texts = [MathTex(str(p)) for p in self.primes]
@@ -26,14 +26,14 @@ class PrimeFactorDecomposition(Scene):
         self.play(Write(self.primes_group))
 
         # Decompose 126 and move it to the left
-        self.next_section()
+        self.next_section("decompose_126")
         group_126, exp_126 = self.decompose_number(126, LEFT * 4.8)
 
         # Pause before starting the next decomposition
         self.wait(1)
 
         # Decompose 120
-        self.next_section()
+        self.next_section("decompose_120")
         group_120, exp_120 = self.decompose_number(120, RIGHT * 4)
 
         self.wait(2)
@@ -44,7 +44,7 @@ class PrimeFactorDecomposition(Scene):
 
         self.wait(2)
 
-        self.next_section()
+        self.next_section("comparison")
         # print("exp 120 : ", exp_120)
         # twos = exp_120.get_part_by_tex("2^{3} ")
         # rect_around_fact = SurroundingRectangle(twos, color=YELLOW)
@@ -1,128 +1,66 @@
 from manim import *
 
+from mathviz.labels import LabelPlacer
+from mathviz.layers import VariantScene
 
-class VectorAddDiffGrid(Scene):
-    def construct(self):
-        # Create a plane with invisible axes but visible grid lines
-        plane = NumberPlane(
-            x_axis_config={"stroke_width": 0}, y_axis_config={"stroke_width": 0}
-        )
-        # Define vectors and shift v1 to start at a different location
-        # v1 = Vector([1, 2], color=BLUE).shift(RIGHT * 2 + UP * 1)
-        v1 = Vector([1, 2], color=BLUE)
-        mv1 = Vector([-1, -2], color=YELLOW)
-        v2 = Vector([-5, -2], color=GREEN)
 
-        # Create labels with arrow notation
-        l1 = MathTex(r"\vec{v}_1", color=BLUE).move_to(v1.get_center() + RIGHT * 0.3)
-        ml1 = MathTex(r"-\vec{v}_1", color=YELLOW).move_to(
-            mv1.get_center() + LEFT * 0.5
-        )
-        l2 = MathTex(r"\vec{v}_2", color=GREEN).move_to(v2.get_center() + UP * 0.3)
+def play_with_relayout(scene, placer, *animations):
+    """Play animations, then move the labels they made overlap out of the way."""
+    scene.play(*animations)
+    relayout = placer.relayout_animations()
+    if relayout:
+        scene.play(*relayout)
 
-        # Group vectors with their labels
-        v1g = VGroup(v1, l1)
-        mv1g = VGroup(mv1, ml1)
-        v2g = VGroup(v2, l2)
 
-        # Define the sum vector and its label, placed in the middle
-        vsum = Vector([1 - 5, 2 - 2], color=RED)  # Sum of the two vectors
-        lsum = MathTex(r"\vec{v}_1 + \vec{v}_2", color=RED).move_to(
-            vsum.get_center() + DOWN * 0.3
-        )
-        vsumg = VGroup(vsum, lsum)
+class VectorAddDiff(VariantScene):
+    # One construct, two videos: VectorAddDiffGrid and VectorAddDiffNoGrid.
+    VARIANTS = {"Grid": {"layers": ["grid"]}, "NoGrid": {}}
 
-        # Define the diff vector and its label, placed in the middle
-        vdiff = Vector([-1 - 5, -2 - 2], color=PURPLE)  # diff of the two vectors
-        ldiff = MathTex(r"\vec{v}_2 - \vec{v}_1", color=PURPLE).move_to(
-            vdiff.get_center() + RIGHT
-        )
-        vdiffg = VGroup(vdiff, ldiff)
-
-        # Add groups to the scene
-        self.add(plane, v1g, v2g)
-        self.wait(2)
-
-        # Animate moving v2 so its tail attaches to the head of v1
-        self.play(v2g.animate.shift(v1.get_end()))
-        self.play(GrowArrow(vsum), FadeIn(lsum))
-        self.play(vsumg.animate.shift(v1.get_start()))
-        self.wait(2)
-
-        l1.shift(LEFT)
-        self.shift(v2, v1, v1g)
-        self.wait(2)
-
-        self.shift(v2, v1, v1g)
-        self.wait(2)
-
-        shift_amount = v2.get_start() - vsum.get_start()
-        self.play(vsumg.animate.shift(shift_amount))
-        self.play(lsum.animate.shift(UP * 0.7))
-
-        self.wait(2)
-        mv1g.shift(v1.get_start())
-        self.play(GrowArrow(mv1), FadeIn(ml1))
-        self.wait(2)
-
-        shift_amount = v2.get_start() - vdiff.get_start()
-        vdiffg.shift(shift_amount)
-
-        self.play(GrowArrow(vdiff), FadeIn(ldiff))
-        self.wait(2)
-
-    def shift(self, va, vb, vag):
-        # Calculate the required shift for v1g so its tail attaches to the head of v2
-        shift_amount = va.get_end() - vb.get_start()
-        # Animate moving v1g using the calculated shift
-        self.play(vag.animate.shift(shift_amount))
-
-
-class VectorAddDiffNoGrid(Scene):
     def construct(self):
+        # Create a plane with invisible axes but visible grid lines
+        plane = NumberPlane(
+            x_axis_config={"stroke_width": 0}, y_axis_config={"stroke_width": 0}
+        )
         # Define vectors and shift v1 to start at a different location
         # v1 = Vector([1, 2], color=BLUE).shift(RIGHT * 2 + UP * 1)
         v1 = Vector([1, 2], color=BLUE)
         mv1 = Vector([-1, -2], color=YELLOW)
         v2 = Vector([-5, -2], color=GREEN)
 
-        # Create labels with arrow notation
-        l1 = MathTex(r"\vec{v}_1", color=BLUE).move_to(v1.get_center() + RIGHT * 0.3)
-        ml1 = MathTex(r"-\vec{v}_1", color=YELLOW).move_to(
-            mv1.get_center() + LEFT * 0.5
-        )
-        l2 = MathTex(r"\vec{v}_2", color=GREEN).move_to(v2.get_center() + UP * 0.3)
+        # Labels are placed next to their vector, away from everything else on
+        # screen, and placed again whenever a chaining moves them into something.
+        self.placer = LabelPlacer()
+        l1 = self.placer.place(MathTex(r"\vec{v}_1", color=BLUE), v1)
+        l2 = self.placer.place(MathTex(r"\vec{v}_2", color=GREEN), v2)
+        # Labels of the vectors shown later are placed when they appear.
+        ml1 = MathTex(r"-\vec{v}_1", color=YELLOW)
 
         # Group vectors with their labels
         v1g = VGroup(v1, l1)
         mv1g = VGroup(mv1, ml1)
         v2g = VGroup(v2, l2)
 
-        # Define the sum vector and its label, placed in the middle
+        # Define the sum vector and its label
         vsum = Vector([1 - 5, 2 - 2], color=RED)  # Sum of the two vectors
-        lsum = MathTex(r"\vec{v}_1 + \vec{v}_2", color=RED).move_to(
-            vsum.get_center() + DOWN * 0.3
-        )
+        lsum = MathTex(r"\vec{v}_1 + \vec{v}_2", color=RED)
         vsumg = VGroup(vsum, lsum)
 
-        # Define the diff vector and its label, placed in the middle
+        # Define the diff vector and its label
         vdiff = Vector([-1 - 5, -2 - 2], color=PURPLE)  # diff of the two vectors
-        ldiff = MathTex(r"\vec{v}_2 - \vec{v}_1", color=PURPLE).move_to(
-            vdiff.get_center() + RIGHT
-        )
+        ldiff = MathTex(r"\vec{v}_2 - \vec{v}_1", color=PURPLE)
         vdiffg = VGroup(vdiff, ldiff)
 
         # Add groups to the scene
-        self.add(v1g, v2g)
+        self.add(self.optional("grid", plane), v1g, v2g)
         self.wait(2)
 
         # Animate moving v2 so its tail attaches to the head of v1
-        self.play(v2g.animate.shift(v1.get_end()))
+        play_with_relayout(self, self.placer, v2g.animate.shift(v1.get_end()))
+        self.placer.place(lsum, vsum)
         self.play(GrowArrow(vsum), FadeIn(lsum))
-        self.play(vsumg.animate.shift(v1.get_start()))
+        play_with_relayout(self, self.placer, vsumg.animate.shift(v1.get_start()))
         self.wait(2)
 
-        l1.shift(LEFT)
         self.shift(v2, v1, v1g)
         self.wait(2)
 
@@ -130,16 +68,17 @@ class VectorAddDiffNoGrid(Scene):
         self.wait(2)
 
         shift_amount = v2.get_start() - vsum.get_start()
-        self.play(vsumg.animate.shift(shift_amount))
-        self.play(lsum.animate.shift(UP * 0.7))
+        play_with_relayout(self, self.placer, vsumg.animate.shift(shift_amount))
 
         self.wait(2)
         mv1g.shift(v1.get_start())
+        self.placer.place(ml1, mv1)
         self.play(GrowArrow(mv1), FadeIn(ml1))
         self.wait(2)
 
         shift_amount = v2.get_start() - vdiff.get_start()
         vdiffg.shift(shift_amount)
+        self.placer.place(ldiff, vdiff)
 
         self.play(GrowArrow(vdiff), FadeIn(ldiff))
         self.wait(2)
@@ -147,8 +86,8 @@ class VectorAddDiffNoGrid(Scene):
     def shift(self, va, vb, vag):
         # Calculate the required shift for v1g so its tail attaches to the head of v2
         shift_amount = va.get_end() - vb.get_start()
-        # Animate moving v1g using the calculated shift
-        self.play(vag.animate.shift(shift_amount))
+        # Animate moving v1g using the calculated shift, then its label if needed
+        play_with_relayout(self, self.placer, vag.animate.shift(shift_amount))
 
 
 class VectorAddMulti(Scene):
@@ -159,11 +98,16 @@ class VectorAddMulti(Scene):
         v3 = Vector([-3, 2], color=YELLOW)
         v4 = Vector([2, -4], color=PURPLE)
 
-        # Create labels for each vector
-        l1 = MathTex(r"\vec{v}_1", color=BLUE).move_to(v1.get_center() + RIGHT * 0.3)
-        l2 = MathTex(r"\vec{v}_2", color=GREEN).move_to(v2.get_center() + UP * 0.5)
-        l3 = MathTex(r"\vec{v}_3", color=YELLOW).move_to(v3.get_center() + UP * 0.5)
-        l4 = MathTex(r"\vec{v}_4", color=PURPLE).move_to(v4.get_center() + RIGHT * 0.3)
+        # Shift all vectors initially to the right by 1.5 units to position them away from the origin
+        for v in (v1, v2, v3, v4):
+            v.shift(RIGHT * 1.5)
+
+        # Create labels for each vector, placed where they overlap nothing
+        self.placer = LabelPlacer()
+        l1 = self.placer.place(MathTex(r"\vec{v}_1", color=BLUE), v1)
+        l2 = self.placer.place(MathTex(r"\vec{v}_2", color=GREEN), v2)
+        l3 = self.placer.place(MathTex(r"\vec{v}_3", color=YELLOW), v3)
+        l4 = self.placer.place(MathTex(r"\vec{v}_4", color=PURPLE), v4)
 
         # Group each vector with its label for synchronized movement
         v1g = VGroup(v1, l1)
@@ -171,46 +115,21 @@ class VectorAddMulti(Scene):
         v3g = VGroup(v3, l3)
         v4g = VGroup(v4, l4)
 
-        # Shift all vectors initially to the right by 1.5 units to position them away from the origin
-        v1g.shift(RIGHT * 1.5)
-        v2g.shift(RIGHT * 1.5)
-        v3g.shift(RIGHT * 1.5)
-        v4g.shift(RIGHT * 1.5)
-
-        # Define the sum vector as the sum of all four vectors
-        vsum_components = [
-            v1.get_vector()[0]
-            + v2.get_vector()[0]
-            + v3.get_vector()[0]
-            + v4.get_vector()[0],
-            v1.get_vector()[1]
-            + v2.get_vector()[1]
-            + v3.get_vector()[1]
-            + v4.get_vector()[1],
-        ]
-        vsum = Vector(vsum_components, color=RED)
-        lsum = MathTex(
-            r"\vec{v}_1 + \vec{v}_2 + \vec{v}_3 + \vec{v}_4", color=RED
-        ).move_to(vsum.get_center() + DOWN * 0.3 + RIGHT * 1.3)
+        # The four vectors as a (4, 2) array; the sum and difference are array sums.
+        vectors = np.array([v.get_vector()[:2] for v in (v1, v2, v3, v4)])
+
+        # Define the sum vector as the sum of all four vectors; its label is placed
+        # when it appears.
+        vsum = Vector(vectors.sum(axis=0), color=RED)
+        lsum = MathTex(r"\vec{v}_1 + \vec{v}_2 + \vec{v}_3 + \vec{v}_4", color=RED)
         vsumg = VGroup(vsum, lsum)
 
         # Define the difference vector (optional, based on original code)
         # Here, assuming you want vdiff = v2 - v1 - v3 - v4
         # Adjust as per your specific requirement
-        vdiff_components = [
-            v2.get_vector()[0]
-            - v1.get_vector()[0]
-            - v3.get_vector()[0]
-            - v4.get_vector()[0],
-            v2.get_vector()[1]
-            - v1.get_vector()[1]
-            - v3.get_vector()[1]
-            - v4.get_vector()[1],
-        ]
+        vdiff_components = np.array([-1, 1, -1, -1]) @ vectors
         vdiff = Vector(vdiff_components, color=PURPLE)
-        ldiff = MathTex(
-            r"\vec{v}_2 - \vec{v}_1 - \vec{v}_3 - \vec{v}_4", color=PURPLE
-        ).move_to(vdiff.get_center() + RIGHT * 0.3)
+        ldiff = MathTex(r"\vec{v}_2 - \vec{v}_1 - \vec{v}_3 - \vec{v}_4", color=PURPLE)
         vdiffg = VGroup(vdiff, ldiff)
 
         # Add all vector groups to the scene
@@ -227,18 +146,19 @@ class VectorAddMulti(Scene):
         # Animate the appearance of the sum vector
         shift_amount = v1.get_start() - vsum.get_start()
         vsumg.shift(shift_amount)
+        self.placer.place(lsum, vsum)
         self.play(GrowArrow(vsum), FadeIn(lsum))
         self.wait(2)
 
         # self.shift(v3, v1, v3g)
         shift_amount = v3.get_end() - v1.get_start()
-        self.play(v3g.animate.shift(-shift_amount))
+        play_with_relayout(self, self.placer, v3g.animate.shift(-shift_amount))
 
         self.shift(v2, v4, v4g)
         self.wait(1)
 
         shift_amount = v3.get_start() - vsum.get_start()
-        self.play(vsumg.animate.shift(shift_amount))
+        play_with_relayout(self, self.placer, vsumg.animate.shift(shift_amount))
         self.wait(2)
 
     def shift(self, va, vb, vag):
@@ -252,5 +172,79 @@ class VectorAddMulti(Scene):
         """
         # Calculate the shift amount needed
         shift_amount = va.get_end() - vb.get_start()
-        # Animate the shift
-        self.play(vag.animate.shift(shift_amount))
+        # Animate the shift, then move the labels it made overlap
+        play_with_relayout(self, self.placer, vag.animate.shift(shift_amount))
+
+
+class VectorSum(Scene):
+    """
+    Tail-to-head sum of any number of 2D vectors.
+
+    Override VECTORS with an (N, 2) array. All the vectors start at START; the tail
+    of each one once chained is given by a single cumulative sum, and the chaining
+    is played as one lagged animation, so N can be in the hundreds.
+    """
+
+    VECTORS = np.array([[1, 3], [-5, -2], [-3, 2], [2, -4]])
+    COLORS = [BLUE, GREEN, YELLOW, PURPLE]
+    START = RIGHT * 1.5
+    # One MathTex per vector: only worth it for a handful of vectors.
+    LABELS = True
+    LAG_RATIO = 0.3
+    RUN_TIME = 3
+
+    def construct(self):
+        vectors = np.asarray(self.VECTORS, dtype=float)
+        n = len(vectors)
+
+        # heads[k] is the sum of the first k + 1 vectors; the tails follow from it.
+        heads = np.cumsum(vectors, axis=0)
+        tails = np.vstack([np.zeros(2), heads[:-1]])
+        # Shifts that move each vector from START to its tail (3D for manim).
+        shifts = np.hstack([tails, np.zeros((n, 1))])
+
+        placer = LabelPlacer()
+        groups = []
+        for k, vector in enumerate(vectors):
+            arrow = Vector(vector, color=self.COLORS[k % len(self.COLORS)])
+            arrow.shift(self.START)
+            group = VGroup(arrow)
+            if self.LABELS:
+                label = MathTex(rf"\vec{{v}}_{{{k + 1}}}", color=arrow.get_color())
+                group.add(placer.place(label, arrow))
+            groups.append(group)
+
+        self.add(*groups)
+        self.wait(2)
+
+        # Chain all the vectors tail-to-head in a single play; labels that now
+        # overlap chained vectors move out of the way.
+        play_with_relayout(
+            self,
+            placer,
+            LaggedStart(
+                *[group.animate.shift(shift) for group, shift in zip(groups, shifts)],
+                lag_ratio=self.LAG_RATIO,
+                run_time=self.RUN_TIME,
+            ),
+        )
+        self.wait(1)
+
+        vsum = Vector(heads[-1], color=RED).shift(self.START)
+        self.play(GrowArrow(vsum))
+        if self.LABELS:
+            terms = " + ".join(rf"\vec{{v}}_{{{k + 1}}}" for k in range(n))
+            lsum = placer.place(MathTex(terms, color=RED), vsum)
+            self.play(FadeIn(lsum))
+        self.wait(2)
+
+
+class RandomWalk(VectorSum):
+    """A 150-step random walk: the same scene with many small vectors."""
+
+    VECTORS = np.random.default_rng(0).normal(scale=0.35, size=(150, 2))
+    COLORS = color_gradient([BLUE, YELLOW], 150)
+    START = ORIGIN
+    LABELS = False
+    LAG_RATIO = 0.5
+    RUN_TIME = 8
@@ -0,0 +1,102 @@
+import pytest
+
+pytest.importorskip("manim")
+
+from mathviz.align import align_tokens, auto_groupings, split_tokens  # noqa: E402
+
+# Steps of the scenes of scenes/calcullit/main.py: (eq1 tokens, eq2 tokens, the
+# groups written by hand in the scene, without the operators, which fade in).
+SCENE_STEPS = {
+    "Mul1": (
+        ["{{3}}", "{{a}}", "\\cdot", "{{4}}", "{{b}}", "\\cdot", "{{2}}"],
+        ["=", "{{12}}", "{{ab}}", "\\cdot", "{{2}}"],
+        [([0, 3], [1]), ([1, 4], [2]), ([6], [4])],
+    ),
+    "Mul1 step 2": (
+        ["=", "{{12}}", "{{ab}}", "\\cdot", "{{2}}"],
+        ["=", "{{24}}", "{{ab}}"],
+        [([1, 4], [1]), ([2], [2])],
+    ),
+    "SimpleDistrib1": (
+        ["{{-4a}}", "\\cdot (", "{{a}}", "{{-2}}", ")"],
+        [
+            "=",
+            "{{(-4a)}}",
+            "\\cdot",
+            "{{a}}",
+            "{{+}}",
+            "{{(-4a)}}",
+            "\\cdot",
+            "{{(-2)}}",
+        ],
+        [([0], [1, 5]), ([2], [3]), ([3], [7])],
+    ),
+    "SimpleDistrib1 step 2": (
+        [
+            "=",
+            "{{(-4a)}}",
+            "\\cdot",
+            "{{a}}",
+            "{{+}}",
+            "{{(-4a)}}",
+            "\\cdot",
+            "{{(-2)}}",
+        ],
+        ["=", "{{-4a^2}}", "{{+}}", "{{8a}}"],
+        [([1, 3], [1]), ([5, 7], [3])],
+    ),
+    "DoubleDistrib1": (
+        ["(", "2", "-a", ")\\cdot(", "3b", "+5", ")"],
+        [
+            "=",
+            "2",
+            "\\cdot",
+            "3b",
+            "+",
+            "2",
+            "\\cdot",
+            "5",
+            "+",
+            "(-a)",
+            "\\cdot",
+            "3b",
+            "+",
+            "(-a)",
+            "\\cdot",
+            "5",
+        ],
+        [([1], [1, 5]), ([4], [3, 11]), ([5], [7, 15]), ([2], [9, 13])],
+    ),
+    "DoubleDistrib1 step 3": (
+        ["=", "6b", "+", "10", "+", "(-3ab)", "+", "(-5a)"],
+        ["=", "6b", "+", "10", "-3ab", "-5a"],
+        [([1], [1]), ([3], [3]), ([5], [4]), ([7], [5])],
+    ),
+}
+
+
+@pytest.mark.parametrize("step", SCENE_STEPS)
+def test_align_tokens_matches_the_scenes(step):
+    eq1_tokens, eq2_tokens, groups = SCENE_STEPS[step]
+    assert align_tokens(eq1_tokens, eq2_tokens) == groups
+
+
+@pytest.mark.parametrize("step", SCENE_STEPS)
+def test_auto_groupings_pair_colors(step):
+    eq1_tokens, eq2_tokens, groups = SCENE_STEPS[step]
+    eq1_groupings, eq2_groupings = auto_groupings(eq1_tokens, eq2_tokens)
+    assert eq1_groupings.keys() == eq2_groupings.keys()
+    assert len(set(eq1_groupings)) == len(groups)
+    assert [(eq1_groupings[c], eq2_groupings[c]) for c in eq1_groupings] == groups
+
+
+@pytest.mark.parametrize(
+    "tokens, pieces",
+    [
+        (["{{3}}", "{{a}}", "\\cdot"], ["3", "a", "\\cdot"]),
+        (["{{-4a}}\\cdot{{a}}"], ["-4a", "\\cdot", "a"]),
+        (["=", "{{12}}{{ab}}"], ["=", "12", "ab"]),
+    ],
+)
+def test_split_tokens(tokens, pieces):
+    assert split_tokens(tokens) == pieces
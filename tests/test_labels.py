@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("manim")
+
+from mathviz.labels import (  # noqa: E402
+    GridIndex,
+    LabelPlacer,
+    box_of,
+    overlap,
+    segment_boxes,
+)
+
+# Boxes (x0, y0, x1, y1) in the index of test_grid_index_hits.
+BOXES = {
+    "origin": [(-0.2, -0.2, 0.2, 0.2)],
+    "wide": [(1.0, 0.0, 4.0, 0.3)],
+    "far": [(10.0, 10.0, 10.5, 10.5)],
+    "pieces": [(-3.0, -3.0, -2.8, -2.8), (-2.8, -2.8, -2.6, -2.6)],
+}
+
+
+@pytest.mark.parametrize(
+    "box, expected",
+    [
+        ((-0.1, -0.1, 0.1, 0.1), {"origin"}),
+        ((0.3, 0.3, 0.9, 0.9), set()),
+        ((3.5, 0.1, 3.6, 0.2), {"wide"}),
+        ((-1.0, -1.0, 2.0, 1.0), {"origin", "wide"}),
+        ((-2.75, -2.75, -2.7, -2.7), {"pieces"}),
+        ((-2.9, -2.7, -2.85, -2.65), set()),
+        ((10.5, 10.5, 11.0, 11.0), set()),
+    ],
+)
+def test_grid_index_hits(box, expected):
+    index = GridIndex(cell=0.5)
+    for key, boxes in BOXES.items():
+        index.insert(key, boxes)
+    assert index.hits(box) == expected
+    assert index.hits(box, ignore=expected) == set()
+
+
+def test_grid_index_remove_and_reinsert():
+    index = GridIndex(cell=0.5)
+    index.insert("box", [(0.0, 0.0, 1.0, 1.0)])
+    index.insert("box", [(5.0, 5.0, 6.0, 6.0)])
+    assert index.hits((0.4, 0.4, 0.6, 0.6)) == set()
+    assert index.hits((5.4, 5.4, 5.6, 5.6)) == {"box"}
+    index.remove("box")
+    assert not index.cells and not index.boxes
+
+
+@pytest.mark.parametrize(
+    "start, end, pieces",
+    [
+        ((0, 0), (1, 0), 5),
+        ((0, 0), (0, -0.1), 1),
+        ((-1, -1), (1, 1), 15),
+    ],
+)
+def test_segment_boxes_cover_the_segment(start, end, pieces):
+    start, end = np.array([*start, 0.0]), np.array([*end, 0.0])
+    boxes = segment_boxes(start, end, thickness=0.1)
+    assert len(boxes) == pieces
+    for t in np.linspace(0, 1, 11):
+        x, y = (start + t * (end - start))[:2]
+        point = (x - 1e-9, y - 1e-9, x + 1e-9, y + 1e-9)
+        assert any(overlap(point, box) for box in boxes)
+
+
+def placer_hits(placer, label):
+    return placer.index.hits(box_of(label), ignore={id(label)})
+
+
+def test_labels_around_a_dot_overlap_nothing():
+    from manim import Dot, Square
+
+    placer = LabelPlacer()
+    dot = Dot()
+    labels = [Square(side_length=0.3) for _ in range(4)]
+    for label in labels:
+        placer.place(label, dot)
+    for label in labels:
+        assert placer_hits(placer, label) == set()
+
+
+def test_label_of_an_arrow_moves_with_it():
+    from manim import ORIGIN, RIGHT, UP, Arrow, Square
+
+    placer = LabelPlacer()
+    arrow = Arrow(ORIGIN, 2 * RIGHT, buff=0)
+    label = placer.place(Square(side_length=0.3), arrow)
+    assert placer_hits(placer, label) == set()
+
+    arrow.shift(3 * UP)
+    assert placer.relayout() == [label]
+    assert placer_hits(placer, label) == set()
+    assert abs(label.get_center()[1] - 3) < 1
@@ -0,0 +1,52 @@
+import pytest
+from sympy import Mul, Symbol, expand
+
+from mathviz.latex_parser import UnsupportedLatex, parse_expression, parse_native
+
+a, b = Symbol("a"), Symbol("b")
+
+# Inputs of the native subset, each compared with sympy's own parser.
+NATIVE = [
+    "3a",
+    "-2ab^2",
+    "3a \\cdot 4b \\cdot 2",
+    "2 \\times 3x",
+    "-4a\\cdot(a-2)",
+    "(2-a)\\cdot(3b+5)",
+    "b-7a+6b-2a",
+    "-(a+b)",
+    "\\left(x+1\\right)^2",
+    "x^{2}y",
+]
+
+
+@pytest.mark.parametrize("latex_str", NATIVE)
+def test_native_parse_matches_parse_latex(latex_str):
+    pytest.importorskip("antlr4")
+    from sympy.parsing.latex import parse_latex
+
+    assert expand(parse_native(latex_str) - parse_latex(latex_str)) == 0
+
+
+@pytest.mark.parametrize(
+    "latex_str, factors",
+    [
+        ("3a \\cdot 4b \\cdot 2", [3, a, 4, b, 2]),
+        ("-2ab", [-2, a, b]),
+    ],
+)
+def test_factors_keep_their_written_order(latex_str, factors):
+    expr = parse_native(latex_str)
+    assert isinstance(expr, Mul)
+    assert list(expr.args) == factors
+
+
+@pytest.mark.parametrize("latex_str", ["\\frac{1}{2}x", "\\sqrt{a}", "a/b"])
+def test_unsupported_input(latex_str):
+    with pytest.raises(UnsupportedLatex):
+        parse_native(latex_str)
+
+
+def test_parse_expression_falls_back_to_parse_latex():
+    pytest.importorskip("antlr4")
+    assert expand(parse_expression("\\frac{1}{2}a") - a / 2) == 0
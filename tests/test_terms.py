@@ -0,0 +1,58 @@
+import pytest
+
+from mathviz.latex_parser import parse_expression
+from mathviz.terms import derive_transitions
+
+# LaTeX input -> [(eq1 tokens, eq2 tokens, groups), ...] for every step.
+TRANSITIONS = {
+    "-4a\\cdot(a-2)": [
+        (
+            ["-4 a \\cdot \\left(a - 2\\right)"],
+            ["=", "-4 a \\cdot a", "-4 a \\cdot \\left(-2\\right)"],
+            [([0], [1, 2])],
+        ),
+        (
+            ["=", "-4 a \\cdot a", "-4 a \\cdot \\left(-2\\right)"],
+            ["=", "-4 a^{2}", "+8 a"],
+            [([1], [1]), ([2], [2])],
+        ),
+    ],
+    "(2-a)\\cdot(3b+5)": [
+        (
+            ["\\left(2 - a\\right) \\cdot \\left(3 b + 5\\right)"],
+            ["=", "2 \\cdot 3 b", "+2 \\cdot 5", "-a \\cdot 3 b", "-a \\cdot 5"],
+            [([0], [1, 2, 3, 4])],
+        ),
+        (
+            ["=", "2 \\cdot 3 b", "+2 \\cdot 5", "-a \\cdot 3 b", "-a \\cdot 5"],
+            ["=", "6 b", "+10", "-3 a b", "-5 a"],
+            [([1], [1]), ([2], [2]), ([3], [3]), ([4], [4])],
+        ),
+    ],
+    "b-7a+6b-2a": [
+        (
+            ["b", "-7 a", "+6 b", "-2 a"],
+            ["=", "b", "+6 b", "-7 a", "-2 a"],
+            [([0, 2], [1, 2]), ([1, 3], [3, 4])],
+        ),
+        (
+            ["=", "b", "+6 b", "-7 a", "-2 a"],
+            ["=", "7 b", "-9 a"],
+            [([1, 2], [1]), ([3, 4], [2])],
+        ),
+    ],
+    "3a \\cdot 4b \\cdot 2": [
+        (["3 a \\cdot 4 b \\cdot 2"], ["=", "24 a b"], [([0], [1])]),
+    ],
+}
+
+
+@pytest.mark.parametrize("latex_str", TRANSITIONS)
+def test_derive_transitions(latex_str):
+    transitions = derive_transitions(parse_expression(latex_str))
+    assert [tuple(t) for t in transitions] == TRANSITIONS[latex_str]
+
+
+@pytest.mark.parametrize("latex_str", ["3a", "7b-2a"])
+def test_simplified_expression_has_no_transition(latex_str):
+    assert derive_transitions(parse_expression(latex_str)) == []